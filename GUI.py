@@ -4,15 +4,25 @@ PyQt6. (requires install)
 """
 
 import sys
+import time
+import asyncio
 from PyQt6.QtWidgets import (QComboBox, QWidget, QVBoxLayout, QHBoxLayout, 
                              QPushButton, QLabel, QFrame, QScrollArea, QDialog,
                              QLineEdit, QSlider, QApplication, QButtonGroup, QRadioButton,
-                             QFileDialog)
-from PyQt6.QtCore import Qt, QTimer, QTime, pyqtSignal, QObject
+                             QFileDialog, QListView)
+from PyQt6.QtCore import (Qt, QTimer, QTime, pyqtSignal, QObject, QThread,
+                          QAbstractListModel, QModelIndex)
 from PyQt6.QtGui import QFont
 from pathlib import Path
 import alarm # Imports the alarm module
+import alarm_store # Imports the alarm_store module
+import flashcard_store # Imports the flashcard_store module
+import flashcard_import # Imports the flashcard_import module
+import spaced_repetition # Imports the spaced_repetition module
 import math_quiz as mq # Imports math_quiz module (as mq)
+import question_pool # Imports the question_pool module
+import recent_filter # Imports the recent_filter module
+import answer_match # Imports the answer_match module
 import random
 
 # --- Values ---
@@ -26,21 +36,87 @@ dark_fg_var="#924F4F"
 dark_hover_var="#BD6565"
 bg = "#212121"
 
-# Dictionary to store Flashcards
-Flashcards = {}
+# Flashcards asked recently, skipped when picking the next one
+recent_flashcards = recent_filter.RecentFilter(mode="flashcards")
 
 # --- Classes ---
 class AlarmSignals(QObject):
     """Signal handler for thread-safe alarm triggering"""
     alarm_triggered = pyqtSignal(object, object, str, str)  # question_gen, callback
 
+class FlashcardListModel(QAbstractListModel):
+    """
+    Saved flashcards for a QListView, read from the store a page at a time.
+    Rows are only fetched as the list is scrolled to them, and the view only
+    draws the visible ones, so showing it costs the same whatever the deck size.
+    """
+    PAGE_SIZE = 200
+
+    def __init__(self, store, parent=None):
+        super().__init__(parent)
+        self.store = store
+        self.rows = [] # (id, question, answer) fetched so far, in id order
+        self.more = store is not None # Whether the store may have cards not fetched yet
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or not 0 <= index.row() < len(self.rows):
+            return None
+        card_id, question, answer = self.rows[index.row()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return f"{question} : {answer}"
+        if role == Qt.ItemDataRole.UserRole:
+            return card_id
+        return None
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self.more
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid() or not self.more:
+            return
+        page = self.store.cards_page(self.rows[-1][0] if self.rows else 0, self.PAGE_SIZE)
+        self.more = len(page) == self.PAGE_SIZE
+        if page:
+            self.beginInsertRows(QModelIndex(), len(self.rows), len(self.rows) + len(page) - 1)
+            self.rows.extend(page)
+            self.endInsertRows()
+
+    def cards_added(self):
+        """Show cards saved since the last fetch, if the list was already scrolled to the end"""
+        if self.store is not None and not self.more:
+            self.more = True
+            self.fetchMore()
+
+class DeckImportThread(QThread):
+    """Imports a flashcard deck file off the GUI thread, reporting progress through signals"""
+    progress = pyqtSignal(float, int, int)  # fraction read, cards added, duplicates skipped
+    imported = pyqtSignal(int, int)  # cards added, duplicates skipped
+    failed = pyqtSignal(str)
+
+    def __init__(self, store, path, parent=None):
+        super().__init__(parent)
+        self.store = store
+        self.path = path
+
+    def run(self):
+        try:
+            added, skipped = flashcard_import.import_cards(self.store, self.path, progress=self.progress.emit)
+        except flashcard_import.IMPORT_ERRORS as e:
+            self.failed.emit(str(e))
+        else:
+            self.imported.emit(added, skipped)
+
 class AlarmPanel(QWidget):
     """
     Displays the list of set alarms in the left panel
     """
-    def __init__(self):
+    def __init__(self, alarm_store=None):
         super().__init__()
         self.alarm_threads = {}
+        self.alarm_store = alarm_store
         self.initUI()
 
     def initUI(self):
@@ -93,15 +169,18 @@ class AlarmPanel(QWidget):
         scroll.setWidget(self.alarm_container)
         layout.addWidget(scroll)
 
-    def add_alarm(self, alarm_time_24hr, alarm_time_display, alarm_thread):
+    def add_alarm(self, alarm_time_24hr, alarm_time_display, alarm_thread, repeat_rule="Once"):
         """
         Add a new alarm to the panel.
         alarm_time_24hr: HH:MM in 24-hour format (for backend).
         alarm_time_display: Formatted display string (e.g., "12:30 PM")
+        repeat_rule: How often the alarm repeats (e.g., "Weekdays")
         """
-        self.alarm_threads[alarm_time_24hr] = alarm_thread
+        alarm_key = self.key_for(alarm_thread)
+        self.alarm_threads[alarm_key] = alarm_thread
         alarm_widget = QFrame()
-        alarm_widget.alarm_time = alarm_time_24hr  # Add this line to identify widget
+        alarm_widget.alarm_key = alarm_key  # Identifies the widget, several alarms can share a time
+        alarm_widget.alarm_time = alarm_time_24hr
         alarm_widget.setStyleSheet(f"""
             QFrame {{
                 background-color: #2a2a2a;
@@ -119,6 +198,13 @@ class AlarmPanel(QWidget):
         time_label.setStyleSheet("color: white;")
         alarm_layout.addWidget(time_label)
 
+        # Repeat label
+        if repeat_rule != "Once":
+            repeat_label = QLabel(repeat_rule)
+            repeat_label.setFont(QFont(font_name, 10))
+            repeat_label.setStyleSheet("color: #888888;")
+            alarm_layout.addWidget(repeat_label)
+
         alarm_layout.addStretch()
 
         # Delete button
@@ -136,53 +222,65 @@ class AlarmPanel(QWidget):
                 background-color: {dark_hover_var}
             }}
         """)
-        delete_btn.clicked.connect(lambda: self.remove_alarm(alarm_widget, alarm_time_24hr))
+        delete_btn.clicked.connect(lambda: self.remove_alarm(alarm_widget, alarm_key))
         alarm_layout.addWidget(delete_btn)
 
         self.alarm_layout.addWidget(alarm_widget)
     
-    def remove_alarm(self, alarm_widget, alarm_time):
-        """Remove an alarm from the panel and stop the alarm thread"""
+    def key_for(self, alarm_thread):
+        """Key of an alarm in alarm_threads: its saved row id, or the alarm itself when unsaved"""
+        return alarm_thread.get('store_id', id(alarm_thread))
+
+    def remove_alarm(self, alarm_widget, alarm_key):
+        """Remove an alarm from the panel and cancel it on the scheduler"""
         self.alarm_layout.removeWidget(alarm_widget)
         alarm_widget.deleteLater()
 
-        if alarm_time in self.alarm_threads:
-            thread_info = self.alarm_threads[alarm_time]
+        if alarm_key in self.alarm_threads:
+            thread_info = self.alarm_threads[alarm_key]
             if 'stop_event' in thread_info:
-                thread_info['stop_event'].set()
-            del self.alarm_threads[alarm_time]
+                alarm.cancel_alarm(thread_info)
+            self.forget_alarm(thread_info)
+            del self.alarm_threads[alarm_key]
 
-        print(f"Removed alarm: {alarm_time}") # Debug print
+        print(f"Removed alarm: {alarm_widget.alarm_time}") # Debug print
 
-    def remove_alarm_by_time(self, alarm_time):
-        """Remove an alarm by its time string (called after alarm completes)"""
-        if alarm_time in self.alarm_threads:
-            thread_info = self.alarm_threads[alarm_time]
+    def remove_finished_alarm(self, alarm_thread):
+        """Remove an alarm after it completes"""
+        alarm_key = self.key_for(alarm_thread)
+        if alarm_key in self.alarm_threads:
+            thread_info = self.alarm_threads[alarm_key]
             
             # Find and remove the widget
             for i in range(self.alarm_layout.count()):
                 widget = self.alarm_layout.itemAt(i).widget()
                 if widget:
-                    # Check if this is the alarm widget for this time
-                    # Store alarm_time in widget to identify it
-                    if hasattr(widget, 'alarm_time') and widget.alarm_time == alarm_time:
+                    # Check if this is the alarm widget for this alarm
+                    if hasattr(widget, 'alarm_key') and widget.alarm_key == alarm_key:
                         self.alarm_layout.removeWidget(widget)
                         widget.deleteLater()
                         break
             
-            # Stop the alarm by setting the stop event
+            # Stop the alarm and take it off the scheduler
             if 'stop_event' in thread_info:
-                thread_info['stop_event'].set()
+                alarm.cancel_alarm(thread_info)
+            self.forget_alarm(thread_info)
             
-            del self.alarm_threads[alarm_time]
-            print(f"Alarm completed and removed: {alarm_time}")
+            del self.alarm_threads[alarm_key]
+            print(f"Alarm completed and removed: {thread_info['alarm_time']}")
+
+    def forget_alarm(self, thread_info):
+        """Delete a removed alarm from the saved alarms"""
+        if self.alarm_store and 'store_id' in thread_info:
+            self.alarm_store.remove_alarm(thread_info['store_id'])
 
 class SettingsPanel(QWidget):
     """
     Settings panel that overlays the main window
     """
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, flashcard_store=None):
         super().__init__(parent)
+        self.flashcard_store = flashcard_store # Saved flashcards, None to not save them
         self.difficulty = "Easy" # Default difficulty
         self.answer_mode = "Multiple Choice" # Default answer mode
         self.alarm_volume = 50
@@ -282,7 +380,7 @@ class SettingsPanel(QWidget):
         settings_layout.addWidget(difficulty_label)
 
         self.difficulty_combo = QComboBox()
-        self.difficulty_combo.addItems(["Easy", "Medium"])
+        self.difficulty_combo.addItems(mq.DIFFICULTY_NAMES)
         self.difficulty_combo.setCurrentText(self.difficulty)
         self.difficulty_combo.setStyleSheet(f"""
             QComboBox {{
@@ -567,6 +665,11 @@ class SettingsPanel(QWidget):
         flashcreate_section.setStyleSheet("color: white; padding-bottom: 10px;")
         settings_layout.addWidget(flashcreate_section)
 
+        # Only the number of saved cards is read here, so opening settings doesn't depend on deck size
+        self.flashcard_count = QLabel()
+        self.flashcard_count.setStyleSheet("color: #888888;")
+        settings_layout.addWidget(self.flashcard_count)
+        self.update_flashcard_count()
 
         # First textbox
         self.Question = QLineEdit()
@@ -575,17 +678,18 @@ class SettingsPanel(QWidget):
 
         # Second textbox
         self.Answer = QLineEdit()
-        self.Answer.setPlaceholderText(f"Answer ")
+        self.Answer.setPlaceholderText(f"Answer (separate accepted answers with |)")
         settings_layout.addWidget(self.Answer)
 
         def create_flashcard():
             questioned = self.Question.text()
             answered = self.Answer.text()
-            Flashcards[questioned]=answered
-
-            flashList = QPushButton(f"{questioned} : {answered}")
-            flashList.setFont(QFont(font_name, 10, QFont.Weight.Bold))
-            settings_layout.addWidget(flashList)
+            if not questioned.strip() or not answered.strip():
+                return
+            if self.flashcard_store:
+                self.flashcard_store.add_card(questioned, answered)
+            self.update_flashcard_count()
+            self.flashcard_model.cards_added()
 
             self.Question.clear()
             self.Answer.clear()
@@ -609,6 +713,60 @@ class SettingsPanel(QWidget):
         submit_button.clicked.connect(create_flashcard)
         settings_layout.addWidget(submit_button)
 
+        # Bulk import from CSV/TSV files and Anki exports
+        import_layout = QHBoxLayout()
+        self.import_button = QPushButton("Import Deck")
+        self.import_button.setFixedWidth(120)
+        self.import_button.setStyleSheet(f"""
+            QPushButton {{
+                background-color: {fg_var};
+                color: #212121;
+                font-size: 14px;
+                font-weight: bold;
+                border-radius: 5px;
+                padding: 8px
+            }}
+            QPushButton:hover {{
+                background-color: {hover_var}
+            }}
+            QPushButton:disabled {{
+                background-color: #555555;
+            }}
+        """)
+        self.import_button.clicked.connect(self.browse_deck_file)
+        self.import_button.setEnabled(self.flashcard_store is not None)
+        import_layout.addWidget(self.import_button)
+
+        self.import_status = QLabel()
+        self.import_status.setStyleSheet("color: #888888;")
+        import_layout.addWidget(self.import_status, stretch=1)
+        settings_layout.addLayout(import_layout)
+        self.import_thread = None
+
+        # Saved flashcards, only the visible rows are read and drawn
+        self.flashcard_model = FlashcardListModel(self.flashcard_store, self)
+        self.flashcard_list = QListView()
+        self.flashcard_list.setModel(self.flashcard_model)
+        self.flashcard_list.setUniformItemSizes(True) # Row heights aren't measured one by one
+        self.flashcard_list.setFont(QFont(font_name, 10, QFont.Weight.Bold))
+        self.flashcard_list.setFixedHeight(240)
+        self.flashcard_list.setStyleSheet(f"""
+            QListView {{
+                color: white;
+                background-color: #2a2a2a;
+                border-radius: 5px;
+                padding: 4px;
+            }}
+            QListView::item {{
+                padding: 4px;
+            }}
+            QListView::item:selected {{
+                background-color: {fg_var};
+                color: #212121;
+            }}
+        """)
+        settings_layout.addWidget(self.flashcard_list)
+
 
     def on_difficulty_changed(self, difficulty):
         """Handle difficulty change"""
@@ -679,6 +837,54 @@ class SettingsPanel(QWidget):
                         }}
                     """)
 
+    def browse_deck_file(self):
+        """Pick a deck file and import it in the background"""
+        file_path, _ = QFileDialog.getOpenFileName(
+            self,
+            "Import Flashcards",
+            "",
+            "Flashcard Decks (*.csv *.tsv *.txt *.apkg);;All Files (*)"
+        )
+        if file_path:
+            self.import_deck(file_path)
+
+    def import_deck(self, file_path):
+        """Start importing a deck file, the settings stay usable while it runs"""
+        if self.import_thread is not None or not self.flashcard_store:
+            return
+        self.import_button.setEnabled(False)
+        self.import_status.setText(f"Importing {Path(file_path).name}...")
+        self.import_thread = DeckImportThread(self.flashcard_store, file_path, self)
+        self.import_thread.progress.connect(self.on_import_progress)
+        self.import_thread.imported.connect(self.on_import_finished)
+        self.import_thread.failed.connect(self.on_import_failed)
+        self.import_thread.finished.connect(self.on_import_thread_done)
+        self.import_thread.start()
+
+    def on_import_progress(self, fraction, added, skipped):
+        self.import_status.setText(f"Importing... {fraction:.0%} ({added} added)")
+        self.update_flashcard_count()
+
+    def on_import_finished(self, added, skipped):
+        self.import_status.setText(f"Imported {added} card{'' if added == 1 else 's'}, "
+                                   f"skipped {skipped} already saved")
+        self.update_flashcard_count()
+        self.flashcard_model.cards_added()
+
+    def on_import_failed(self, message):
+        self.import_status.setText(f"Import failed: {message}")
+        print(f"Flashcard import failed: {message}")
+
+    def on_import_thread_done(self):
+        self.import_thread.deleteLater()
+        self.import_thread = None
+        self.import_button.setEnabled(True)
+
+    def update_flashcard_count(self):
+        """Show how many flashcards are saved"""
+        count = self.flashcard_store.count() if self.flashcard_store else 0
+        self.flashcard_count.setText(f"{count} saved flashcard{'' if count == 1 else 's'}")
+
     def get_volume(self):
         """Get current volume setting"""
         return self.volume_slider.value()
@@ -899,9 +1105,17 @@ class QuestionDialog(QDialog):
     """
     Dialog that displays a question and requires correct answer to dismiss
     """
-    def __init__(self, parent=None, question_generator=None, difficulty="Easy", answer_mode="Multiple Choice"):
+    def __init__(self, parent=None, question_generator=None, difficulty="Easy", answer_mode="Multiple Choice",
+                 flashcard_store=None, card_scheduler=None):
         super().__init__(parent)
-        self.question_generator = question_generator or mq.MathQuestionGenerator()
+        self.flashcard_store = flashcard_store
+        # Picks flashcards by due time and saves every answer
+        if card_scheduler is None and flashcard_store:
+            card_scheduler = spaced_repetition.CardScheduler(flashcard_store)
+        self.card_scheduler = card_scheduler
+        self.card_id = None
+        self.card_graded = False
+        self.question_generator = question_generator or mq.MathQuestionGenerator(pool=question_pool.pool)
         self.question_generator.set_difficulty(difficulty)
         self.answer_mode = answer_mode
         self.correct_answer = None
@@ -950,10 +1164,14 @@ class QuestionDialog(QDialog):
         self.main_layout.addSpacing(10)
 
     def generate_new_question(self):
-        if self.answer_mode == "Flash Cards":
-            question = random.choice(list(Flashcards.keys())) 
+        # Falls back to a math question when there are no flashcards yet
+        card = self.card_scheduler.next_card(recent_flashcards) if self.answer_mode == "Flash Cards" and self.card_scheduler else None
+        if card:
+            self.card_id = card['id']
+            self.card_graded = False
+            question = card['question']
             self.question_label.setText(question)
-            answer = Flashcards[question]
+            answer = card['answer']
             self.correct_answer = answer
             self.question = question
             self.feedback_label.clear()
@@ -1089,7 +1307,12 @@ class QuestionDialog(QDialog):
     
     def check_flash_answer(self):
         user_answer = self.answer_input.text()
-        if user_answer == self.correct_answer:
+        correct = answer_match.answer_key(self.correct_answer, answer_match.DEFAULT_TOLERANCE).matches(user_answer)
+        if self.card_scheduler and self.card_id is not None:
+            # Only the first answer reschedules the card, retries are just saved
+            self.card_scheduler.record_answer(self.card_id, correct, grade=not self.card_graded)
+            self.card_graded = True
+        if correct:
             self.feedback_label.setStyleSheet("color: #6BC582;")
             self.feedback_label.setText("Correct! Alarm dismissed.")
             QTimer.singleShot(500, self.accept)
@@ -1104,26 +1327,27 @@ class QuestionDialog(QDialog):
             self.feedback_label.setText("Correct! Alarm dismissed.")
             QTimer.singleShot(500, self.accept)
         else:
+            # Swap in a new question so the answer can't be found by elimination
+            self.generate_new_question()
             self.feedback_label.setStyleSheet("color: #BD6565;")
             self.feedback_label.setText("Wrong! Try again.")
 
     def check_typed_answer(self):
         """Check if the user's answer is correct"""
-        try:
-            user_answer = int(self.answer_input.text())
-        
-            if user_answer == self.correct_answer:
-                self.feedback_label.setStyleSheet("color: #6BC582;")
-                self.feedback_label.setText("Correct! Alarm dismissed.")
-                QTimer.singleShot(500, self.accept)
-            else:
-                self.feedback_label.setStyleSheet("color: #BD6565;")
-                self.feedback_label.setText("Wrong! Try again.")
-                self.answer_input.clear()
-        except ValueError:
+        user_answer = self.answer_input.text()
+        if not answer_match.is_number(user_answer):
             self.feedback_label.setStyleSheet("color: #BD6565;")
             self.feedback_label.setText("Please enter a valid number.")
             self.answer_input.clear()
+        # Accepts spacing, a leading + and full-width digits
+        elif answer_match.answer_key(str(self.correct_answer)).matches(user_answer):
+            self.feedback_label.setStyleSheet("color: #6BC582;")
+            self.feedback_label.setText("Correct! Alarm dismissed.")
+            QTimer.singleShot(500, self.accept)
+        else:
+            self.feedback_label.setStyleSheet("color: #BD6565;")
+            self.feedback_label.setText("Wrong! Try again.")
+            self.answer_input.clear()
 
     def closeEvent(self, event):
         """Prevent closing without correct answer"""
@@ -1392,6 +1616,7 @@ class SetCancelButtons(QWidget):
         self.main_window = main_window
         self.buttons_hidden = True # Initially sets that buttons are hidden
         self.alarms = []
+        self.open_dialogs = [] # Question dialogs shown by coroutine alarms
         self.create_buttons()
         # Signal handler for alarms
         self.alarm_signals = AlarmSignals()
@@ -1430,9 +1655,54 @@ class SetCancelButtons(QWidget):
             }}
         """)
 
+        # Repeat rule dropdown (shown while setting an alarm)
+        self.repeatCombo = QComboBox(parent=self)
+        self.repeatCombo.addItems(["Once", "Daily", "Weekdays", "Weekends", "Custom"])
+        self.repeatCombo.setFixedHeight(60)
+        self.repeatCombo.setStyleSheet(f"""
+            QComboBox {{
+                background-color: #2a2a2a;
+                color: white;
+                border: 2px solid {fg_var};
+                border-radius: 5px;
+                padding: 8px;
+                font-size: 14px;
+            }}
+            QComboBox QAbstractItemView {{
+                background-color: #2a2a2a;
+                color: white;
+                selection-background-color: {fg_var};
+            }}
+        """)
+        self.repeatCombo.currentTextChanged.connect(self.on_repeat_changed)
+
+        # Cron rule input for "Custom", e.g. "* * 1-5" or "30 6 * * mon-fri"
+        self.cronInput = QLineEdit(parent=self)
+        self.cronInput.setPlaceholderText("Cron rule (e.g., * * mon-fri)")
+        self.cronInput.setFixedHeight(60)
+        self.cronInput.setStyleSheet(f"""
+            QLineEdit {{
+                background-color: #2a2a2a;
+                color: white;
+                border: 2px solid {fg_var};
+                border-radius: 5px;
+                padding: 8px;
+                font-size: 14px;
+            }}
+        """)
+
+        for widget in (self.repeatCombo, self.cronInput):
+            # Keep the layout still while the repeat widgets are hidden
+            policy = widget.sizePolicy()
+            policy.setRetainSizeWhenHidden(True)
+            widget.setSizePolicy(policy)
+            widget.hide()
+
         # Adds buttons to layout
         button_layout.addWidget(self.setBtn)
         button_layout.addWidget(self.cancelBtn)
+        button_layout.addWidget(self.repeatCombo)
+        button_layout.addWidget(self.cronInput)
 
         # Position set/cancel buttons
         button_container = QHBoxLayout()
@@ -1469,6 +1739,8 @@ class SetCancelButtons(QWidget):
                     filter: brightness(1.2);
                 }}
             """)
+            self.repeatCombo.setCurrentText("Once")
+            self.repeatCombo.show()
             self.up_down_buttons.show_buttons()
             self.digital_clock.enter_alarm_mode()
             self.buttons_hidden = False
@@ -1483,37 +1755,15 @@ class SetCancelButtons(QWidget):
 
             alarm_time_24hr = self.digital_clock.get_alarm_time_string()
             alarm_time_display = self.digital_clock.get_alarm_display_string()
-            self.alarms.append(alarm_time_24hr)
-            print(f"Alarm set for: {alarm_time_24hr} with {difficulty} difficulty and {answer_mode} mode") # Debug print
-
-            # Create question generator (can be customized later)
-            question_gen = mq.MathQuestionGenerator(difficulty=difficulty)
 
-            # Store alarm time for removal after completion
-            alarm_time_to_remove = alarm_time_24hr
-
-            # Create a thread-safe callback using signals
-            def on_alarm():
-                """Signal main thread to show question dialog"""
-                import threading
-                result_event = threading.Event()
-                result_container = {'success': False}
-
-                def callback(success):
-                    result_container['success'] = success
-                    result_event.set()
-
-                # Emit signal to main thread
-                self.alarm_signals.alarm_triggered.emit(question_gen, callback, difficulty, answer_mode)
-
-                # Wait for result
-                result_event.wait()
-
-                # Remove alarm from panel after correct answer
-                if result_container['success']:
-                    self.alarm_panel.remove_alarm_by_time(alarm_time_to_remove)
-
-                return result_container['success']
+            # Get the repeat rule, checking it fires before saving
+            repeat_rule = self.get_repeat_rule()
+            try:
+                alarm.check_alarm(alarm_time_24hr, repeat_rule)
+            except ValueError as e:
+                print(f"Invalid repeat rule: {e}")
+                self.cronInput.setStyleSheet(self.cronInput.styleSheet().replace(fg_var, dark_fg_var))
+                return
 
             # Get volume and sound file from settings
             if hasattr(self.main_window, 'settings_panel'):
@@ -1522,11 +1772,18 @@ class SetCancelButtons(QWidget):
             else:
                 volume = 50
                 sound_file = None
-                
-            # Add alarm to the panel and start it
-            alarm_thread = alarm.start_alarm(alarm_time_24hr, on_alarm_trigger=on_alarm,
-                                             volume=volume, sound_file=sound_file)
-            self.alarm_panel.add_alarm(alarm_time_24hr, alarm_time_display, alarm_thread)
+
+            # Save the alarm so it is restored after a restart
+            store_id = None
+            seed = random.getrandbits(32) # Seed for this alarm's questions
+            if self.alarm_panel.alarm_store:
+                store_id = self.alarm_panel.alarm_store.add_alarm(
+                    alarm_time_24hr, alarm_time_display, difficulty, answer_mode, volume, sound_file, repeat_rule, seed)
+
+            alarm_thread = self.schedule_alarm(alarm_time_24hr, difficulty, answer_mode,
+                                               volume, sound_file, store_id, repeat_rule, seed)
+            self.alarm_panel.add_alarm(alarm_time_24hr, alarm_time_display, alarm_thread, repeat_rule)
+            print(f"Alarm set for: {alarm_time_24hr} ({repeat_rule}) with {difficulty} difficulty and {answer_mode} mode") # Debug print
 
             # Exit alarm mode
             self.cancelBtn.setEnabled(False)  # Disable clicking
@@ -1538,10 +1795,77 @@ class SetCancelButtons(QWidget):
                     font-size: 24px;
                 }}
             """)
+            self.hide_repeat_widgets()
             self.up_down_buttons.hide_buttons()
             self.digital_clock.exit_alarm_mode()
             self.buttons_hidden = True
 
+    def schedule_alarm(self, alarm_time_24hr, difficulty="Easy", answer_mode="Multiple Choice",
+                       volume=50, sound_file=None, store_id=None, repeat_rule="Once", seed=None, saved=False):
+        """
+        Start an alarm that shows the question dialog when it goes off.
+        seed: seed the alarm's questions are drawn from, each ring gets its own stream from it
+        saved: restoring an alarm that was checked when it was saved
+        Returns the alarm info to be added to the alarm panel.
+        """
+        self.alarms.append(alarm_time_24hr)
+
+        # Question generator, built the first time the alarm is prepared so restoring many alarms stays fast
+        question_gen = None
+        if seed is None:
+            seed = random.getrandbits(32)
+
+        def prepare(deadline):
+            """Switch to this ring's question stream and generate it ahead in the pool, once the ring is close"""
+            nonlocal question_gen
+            ring_seed = mq.ring_seed(seed, deadline)
+            if question_gen is None:
+                question_gen = mq.MathQuestionGenerator(difficulty=difficulty, pool=question_pool.pool, seed=ring_seed)
+            question_gen.use_seed(ring_seed)
+            question_pool.pool.prefill(question_gen)
+
+        # Create a thread-safe callback using signals
+        def on_alarm():
+            """Signal main thread to show question dialog"""
+            import threading
+            result_event = threading.Event()
+            result_container = {'success': False}
+
+            def callback(success):
+                result_container['success'] = success
+                result_event.set()
+
+            # Emit signal to main thread
+            self.alarm_signals.alarm_triggered.emit(question_gen, callback, difficulty, answer_mode)
+
+            # Wait for result
+            result_event.wait()
+
+            # Remove one-off alarms from panel after correct answer
+            if result_container['success'] and repeat_rule == "Once":
+                self.alarm_panel.remove_finished_alarm(alarm_thread)
+
+            return result_container['success']
+
+        async def on_alarm_async():
+            """Show question dialog without blocking the shared event loop"""
+            success = await self.ask_question(question_gen, difficulty, answer_mode)
+            if success and repeat_rule == "Once":
+                self.alarm_panel.remove_finished_alarm(alarm_thread)
+            return success
+
+        if alarm.running_loop():
+            # Running on a qasync loop: the alarm rings as a coroutine
+            alarm_thread = alarm.start_alarm_soon(alarm_time_24hr, on_alarm_async,
+                                                  volume, sound_file, repeat_rule, prepare, saved)
+        else:
+            alarm_thread = alarm.start_alarm(alarm_time_24hr, on_alarm_trigger=on_alarm,
+                                             volume=volume, sound_file=sound_file, repeat=repeat_rule,
+                                             prepare=prepare, saved=saved)
+        if store_id is not None:
+            alarm_thread['store_id'] = store_id
+        return alarm_thread
+
     def cancelAlarm(self):
         """Cancel setting the alarm"""
         self.cancelBtn.setEnabled(False)  # Disable clicking
@@ -1553,13 +1877,52 @@ class SetCancelButtons(QWidget):
                 font-size: 24px;
             }}
         """)
+        self.hide_repeat_widgets()
         self.up_down_buttons.hide_buttons()
         self.digital_clock.exit_alarm_mode()
         self.buttons_hidden = True
 
+    def on_repeat_changed(self, repeat):
+        """Show the cron input only for custom repeat rules"""
+        self.cronInput.setVisible(repeat == "Custom")
+
+    def get_repeat_rule(self):
+        """Get the selected repeat rule, or the typed cron rule for Custom"""
+        if self.repeatCombo.currentText() == "Custom":
+            return self.cronInput.text().strip()
+        return self.repeatCombo.currentText()
+
+    def hide_repeat_widgets(self):
+        self.repeatCombo.hide()
+        self.cronInput.hide()
+        self.cronInput.clear()
+        self.cronInput.setStyleSheet(self.cronInput.styleSheet().replace(dark_fg_var, fg_var))
+
+    def ask_question(self, question_gen, difficulty, answer_mode):
+        """
+        Open the question dialog without blocking the event loop.
+        Returns a future that is set to True once the question is solved.
+        """
+        future = asyncio.get_running_loop().create_future()
+        print(f"Alarm questions from seed {question_gen.seed}") # Debug print, replay with math_quiz.py
+        dialog = QuestionDialog(None, question_gen, difficulty, answer_mode, self.main_window.flashcard_store,
+                                self.main_window.card_scheduler)
+        self.open_dialogs.append(dialog) # Keep the dialog alive while it's open
+
+        def on_finished(result):
+            self.open_dialogs.remove(dialog)
+            if not future.done():
+                future.set_result(result == QDialog.DialogCode.Accepted.value)
+
+        dialog.finished.connect(on_finished)
+        dialog.open()
+        return future
+
     def show_question_dialog(self, question_gen, callback, difficulty, answer_mode):
         """Show question dialog in main thread with specified difficulty and answer mode"""
-        dialog = QuestionDialog(None, question_gen, difficulty, answer_mode)
+        print(f"Alarm questions from seed {question_gen.seed}") # Debug print, replay with math_quiz.py
+        dialog = QuestionDialog(None, question_gen, difficulty, answer_mode, self.main_window.flashcard_store,
+                                self.main_window.card_scheduler)
         result = dialog.exec() == QDialog.DialogCode.Accepted
         callback(result)
 
@@ -1594,8 +1957,14 @@ class MainWindow(QWidget):
         main_horizontal = QHBoxLayout()
         self.setLayout(main_horizontal)
 
+        # Saved alarms and flashcards
+        self.alarm_store = alarm_store.AlarmStore()
+        self.flashcard_store = flashcard_store.FlashcardStore()
+        self.card_scheduler = spaced_repetition.CardScheduler(self.flashcard_store)
+        self.card_scheduler.start_loading() # Off the GUI thread, the first flashcard alarm doesn't wait on it
+
         # Create alarm panel on the left
-        self.alarm_panel = AlarmPanel()
+        self.alarm_panel = AlarmPanel(self.alarm_store)
         alarm_panel_frame = QFrame()
         alarm_panel_frame.setFixedWidth(300)
         alarm_panel_frame.setStyleSheet(f"background-color: #1a1a1a; border-radius: 15px;")
@@ -1612,7 +1981,7 @@ class MainWindow(QWidget):
         main_horizontal.addWidget(clock_widget)
 
         # Create settings panel (initially hidden, overlays clock widget)
-        self.settings_panel = SettingsPanel(clock_widget)
+        self.settings_panel = SettingsPanel(clock_widget, self.flashcard_store)
 
         # Add settings button in top right
         settings_layout = QHBoxLayout()
@@ -1651,6 +2020,39 @@ class MainWindow(QWidget):
                                                  self.DigitalClock, self.alarm_panel, self)
     
         self.cancel_button_color = dark_fg_var  # Store default color
+
+        # Restore once the event loop (possibly qasync's) is running
+        QTimer.singleShot(0, self.restore_alarms)
+
+    def restore_alarms(self):
+        """
+        Reschedule every saved alarm.
+        All alarms are scheduled straight away; their panel widgets are
+        built in batches afterwards so a long list doesn't hold up startup.
+        """
+        start = time.perf_counter()
+        restored = []
+        # Saved alarms were checked when they were saved, and go onto the scheduler in one batch
+        with alarm.adding_many():
+            for saved in self.alarm_store.load_alarms():
+                # Skip bad rows rather than failing every start
+                try:
+                    alarm_thread = self.SetCancelButtons.schedule_alarm(
+                        saved['alarm_time'], saved['difficulty'], saved['answer_mode'],
+                        saved['volume'], saved['sound_file'], saved['id'], saved['repeat_rule'], saved['seed'],
+                        saved=True)
+                except ValueError as e:
+                    print(f"Skipping saved alarm {saved['alarm_time']} ({saved['repeat_rule']}): {e}") # Debug print
+                    continue
+                restored.append((saved['alarm_time'], saved['alarm_time_display'], alarm_thread, saved['repeat_rule']))
+        print(f"Restored {len(restored)} alarms in {(time.perf_counter() - start) * 1000:.1f} ms") # Debug print
+
+        def add_batch(start_index=0, batch_size=100):
+            for saved_alarm in restored[start_index:start_index + batch_size]:
+                self.alarm_panel.add_alarm(*saved_alarm)
+            if start_index + batch_size < len(restored):
+                QTimer.singleShot(0, lambda: add_batch(start_index + batch_size))
+        add_batch()
     
     def open_settings(self):
         """Show the settings panel"""
@@ -1,102 +1,681 @@
+import sys
 import time
 import datetime
-import winsound  
+import collections
+import contextlib
+import functools
+import heapq
+import itertools
 import threading
-from pathlib import Path
+import audio # Imports the audio module (started lazily)
 
-# Try to import pygame for custom sounds, fallback to winsound
-try:
-    import pygame
-    pygame.mixer.init()
-    PYGAME_AVAILABLE = True
-except ImportError:
-    PYGAME_AVAILABLE = False
-    print("pygame not available, using winsound beeps only")
+# Longest the scheduler sleeps before checking the wall clock for jumps (seconds).
+# There is no portable notification for a wall clock step, so an alarm whose
+# deadline is stepped over can fire up to this late, and an idle scheduler
+# with alarms set wakes 60 / CLOCK_CHECK_INTERVAL times a minute
+CLOCK_CHECK_INTERVAL = 5.0
+# Wall clock drift, relative to the monotonic clock, treated as a jump (seconds)
+CLOCK_JUMP_TOLERANCE = 0.5
+# Firing late by more than this is reported (seconds)
+JITTER_TARGET = 0.05
+# Start the audio backend this long before the next alarm, 0 to disable (seconds)
+AUDIO_PREWARM_SECONDS = 3.0
 
-#Looping beep that increases in length over time
+class SystemClock:
+    """
+    Time source used by the scheduler.
+    Kept separate so tests and benchmarks can swap in a fake clock.
+    """
+    def time(self):
+        """Wall clock time, seconds since the epoch"""
+        return time.time()
+
+    def monotonic(self):
+        """Clock that never jumps, used to measure sleeps"""
+        return time.monotonic()
 
-def Beep(stop_event, volume=50, sound_file=None):
+    def wait(self, condition, timeout=None):
+        """Block on the scheduler's condition for up to timeout seconds"""
+        condition.wait(timeout)
+
+class StopEvent:
     """
-    Play alarm sound - either custom sound file or beep.
-    volume: 0-100 percentage.
-    sound_file: path to audio file (mp3, wav, ogg).
+    threading.Event that only builds its lock once something waits on it.
+    Every alarm has one, and almost all are only ever set and checked, so this
+    keeps creating thousands of alarms (restoring saved ones) cheap.
     """
-    if sound_file and PYGAME_AVAILABLE and Path(sound_file).exists():
-        # Play custom sound using pygame
-        try:
-            pygame.mixer.music.load(sound_file)
-            pygame.mixer.music.set_volume(volume / 100.0)
-
-            while not stop_event.is_set():
-                if not pygame.mixer.music.get_busy():
-                    pygame.mixer.music.play()
-                time.sleep(0.1)
-            
-            pygame.mixer.music.stop()
+    __slots__ = ('_flag', '_event')
+    _lock = threading.Lock() # Guards building the real event
+
+    def __init__(self):
+        self._flag = False
+        self._event = None
+
+    def is_set(self):
+        return self._flag
+
+    def set(self):
+        self._flag = True
+        if self._event is not None:
+            self._event.set()
+
+    def wait(self, timeout=None):
+        with StopEvent._lock:
+            if self._event is None:
+                self._event = threading.Event()
+        # set() may have run before the event existed
+        if self._flag:
+            self._event.set()
+        return self._event.wait(timeout)
+
+class AlarmScheduler:
+    """
+    Runs every alarm from a single background thread.
+    Deadlines are kept in a min-heap, so adding, cancelling and firing
+    an alarm each cost O(log n) no matter how many alarms are set.
+    """
+    def __init__(self, clock=None):
+        self.clock = clock or SystemClock()
+        self._heap = [] # (deadline, sequence, alarm_info) tuples
+        self._sequence = itertools.count()
+        self._cancelled = 0 # Cancelled entries still sitting in the heap
+        self._condition = threading.Condition()
+        self._bulk = False # Inside adding_many, heap is re-ordered once at the end
+        self.jitter = collections.deque(maxlen=1000) # Seconds late for recent alarms
+        self.thread = None
+
+    def add(self, alarm_info):
+        """Schedule an alarm dictionary created by create_alarm"""
+        with self._condition:
+            entry = (alarm_info['deadline'], next(self._sequence), alarm_info)
+            alarm_info['scheduler'] = self
+            alarm_info['added_at'] = self.clock.time()
+            if self._bulk:
+                self._heap.append(entry)
+                return
+            heapq.heappush(self._heap, entry)
+            self._start()
+            # Wake the scheduler in case this alarm is now the earliest one
+            self._wake()
+
+    @contextlib.contextmanager
+    def adding_many(self):
+        """
+        Add a batch of alarms (e.g. every saved alarm at startup) with one heapify
+        instead of a heap push per alarm. The scheduler is held until the block ends.
+        """
+        with self._condition:
+            size = len(self._heap)
+            self._bulk = True
+            try:
+                yield self
+            finally:
+                self._bulk = False
+                if len(self._heap) > size:
+                    heapq.heapify(self._heap)
+                    self._start()
+                    self._wake()
+
+    def cancel(self, alarm_info):
+        """
+        Cancel a scheduled alarm.
+        The heap entry is dropped lazily when it reaches the top, and the
+        heap is compacted once cancelled entries make up half of it.
+        """
+        with self._condition:
+            # Stop a ringing alarm even if its stop_event was already set by the caller
+            if alarm_info.get('ringing'):
+                alarm_info['ringing'].set()
+            if alarm_info['stop_event'].is_set():
+                return
+            alarm_info['stop_event'].set()
+            if alarm_info.get('fired'):
+                return # Already out of the heap
+            alarm_info['cancelled'] = True
+            self._cancelled += 1
+            if self._cancelled * 2 > len(self._heap):
+                self._heap = [entry for entry in self._heap if not entry[2]['stop_event'].is_set()]
+                heapq.heapify(self._heap)
+                self._cancelled = 0
+            self._wake()
+
+    def __len__(self):
+        with self._condition:
+            return len(self._heap) - self._cancelled
+
+    def jitter_stats(self):
+        """Summarise how late recent alarms fired, in milliseconds"""
+        samples = sorted(self.jitter)
+        if not samples:
+            return {'count': 0}
+        return {
+            'count': len(samples),
+            'mean_ms': sum(samples) / len(samples) * 1000,
+            'p50_ms': samples[len(samples) // 2] * 1000,
+            'p99_ms': samples[min(len(samples) - 1, int(len(samples) * 0.99))] * 1000,
+            'max_ms': samples[-1] * 1000,
+        }
+
+    def _start(self):
+        """Start the scheduler thread if it isn't running"""
+        if self.thread is None or not self.thread.is_alive():
+            self.thread = threading.Thread(target=self._run, name="AlarmScheduler", daemon=True)
+            self.thread.start()
+
+    def _wake(self):
+        """Wake the scheduler so it re-checks the earliest deadline"""
+        self._condition.notify()
+
+    def _ring(self, alarm_info):
+        """Ring a due alarm without holding up the scheduler"""
+        threading.Thread(target=ring_alarm, args=(alarm_info,), daemon=True).start()
+
+    def _discard(self, alarm_info):
+        """Forget a stopped alarm popped off the heap"""
+        if alarm_info.get('cancelled'):
+            self._cancelled -= 1
+
+    def _reschedule(self, alarm_info, fired_at):
+        """Push a repeating alarm back onto the heap at its next fire time"""
+        next_fire = None
+        if alarm_info['repeat'] != "Once":
+            # Restored alarms only build their Recurrence once they first ring
+            if alarm_info['recurrence'] is None:
+                alarm_info['recurrence'] = get_recurrence(alarm_info['alarm_time'], alarm_info['repeat'])
+            recurrence = alarm_info['recurrence']
+            after = datetime.datetime.fromtimestamp(fired_at) + datetime.timedelta(seconds=1)
+            next_fire = recurrence.next_fire(after)
+        if next_fire is None:
+            alarm_info['fired'] = True
             return
-        except Exception as e:
-            print(f"Error playing sound file: {e}")
-            print("Falling back to beep")
+        alarm_info['deadline'] = next_fire
+        alarm_info['prewarmed'] = False
+        heapq.heappush(self._heap, (next_fire, next(self._sequence), alarm_info))
 
-    # Fallback to winsound beep
-    length = 500
-    # Map volume (0-100) to frequency (500-2000 Hz)
-    base_freq = 500 + (volume * 15)
+    def _pop_due(self):
+        """
+        Take every alarm that is due off the heap.
+        Returns (due alarms, seconds until the next deadline or None if there are no alarms).
+        Must be called with the condition held.
+        """
+        # Drop cancelled alarms sitting on top of the heap
+        while self._heap and self._heap[0][2]['stop_event'].is_set():
+            self._discard(heapq.heappop(self._heap)[2])
+        if not self._heap:
+            return [], None
 
-    while not stop_event.is_set():
+        now = self.clock.time()
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            deadline, _, alarm_info = heapq.heappop(self._heap)
+            if alarm_info['stop_event'].is_set():
+                self._discard(alarm_info)
+                continue
+            due.append(alarm_info)
+            alarm_info['ring_deadline'] = deadline # 'deadline' moves on to the next repeat below
+            # An HH:MM alarm set during its own minute is due from when it was added
+            late = now - max(deadline, alarm_info.get('added_at', deadline))
+            self.jitter.append(late)
+            if late > JITTER_TARGET:
+                print(f"Alarm {alarm_info['alarm_time']} fired {late * 1000:.0f} ms late")
+            self._reschedule(alarm_info, max(deadline, now))
+
+        remaining = self._heap[0][0] - now if self._heap else None
+        return due, remaining
+
+    def _sleep_time(self, remaining):
+        """
+        How long to sleep: until the next deadline, or until it is time to
+        pre-warm the audio for it, but never longer than CLOCK_CHECK_INTERVAL.
+        Must be called with the condition held.
+        """
+        alarm_info = self._heap[0][2]
+        if AUDIO_PREWARM_SECONDS and not alarm_info.get('prewarmed'):
+            if remaining <= AUDIO_PREWARM_SECONDS:
+                alarm_info['prewarmed'] = True
+                audio.prewarm(alarm_info['sound_file'], alarm_info['volume'])
+                prepare_ring(alarm_info, alarm_info['deadline'])
+            else:
+                remaining -= AUDIO_PREWARM_SECONDS
+        return min(remaining, CLOCK_CHECK_INTERVAL)
+
+    def _check_clock(self, offset):
+        """
+        Report a wall clock step since offset (wall minus monotonic) was taken.
+        The caller goes straight back to checking deadlines against the new
+        wall clock, so nothing else needs doing here.
+        """
+        drift = self.clock.time() - self.clock.monotonic() - offset
+        if abs(drift) > CLOCK_JUMP_TOLERANCE:
+            print(f"Wall clock jumped by {drift:+.1f}s, rechecking alarms")
+
+    def _run(self):
+        """
+        Sleep until the earliest deadline, then fire every alarm that is due.
+        Sleeps are measured on the monotonic clock and last at most
+        CLOCK_CHECK_INTERVAL, so a wall clock step (NTP, manual change)
+        is noticed and the deadline re-measured within that many seconds;
+        there is no earlier wake-up for a step.
+        """
+        clock = self.clock
+        while True:
+            with self._condition:
+                due, remaining = self._pop_due()
+                if not due:
+                    if remaining is None:
+                        clock.wait(self._condition)
+                    else:
+                        offset = clock.time() - clock.monotonic()
+                        clock.wait(self._condition, self._sleep_time(remaining))
+                        self._check_clock(offset)
+                    continue
+
+            # Ring outside the lock so alarms can still be added meanwhile
+            for alarm_info in due:
+                self._ring(alarm_info)
+
+class AsyncAlarmScheduler(AlarmScheduler):
+    """
+    Alarm scheduler that runs as a single task on an asyncio loop,
+    e.g. a qasync loop shared with the QApplication.
+    Alarms ring as coroutines, so no OS threads are started per alarm.
+    Must only be used from the loop's thread.
+    """
+    def __init__(self, clock=None):
+        super().__init__(clock)
+        self.task = None
+        self._wake_event = None
+
+    def _start(self):
+        # asyncio is imported only when used, it is slow to import for headless starts
+        import asyncio
+        if self.task is None or self.task.done():
+            self._wake_event = asyncio.Event()
+            self.task = asyncio.get_running_loop().create_task(self._run())
+
+    def _wake(self):
+        if self._wake_event:
+            self._wake_event.set()
+
+    def _ring(self, alarm_info):
+        import asyncio
+        asyncio.get_running_loop().create_task(ring_alarm_async(alarm_info))
+
+    async def _run(self):
+        import asyncio
+        clock = self.clock
+        while True:
+            # Nothing else runs on the loop between clearing and checking
+            self._wake_event.clear()
+            with self._condition:
+                due, remaining = self._pop_due()
+            if not due:
+                # A timer sets the wake event instead of asyncio.wait_for,
+                # which can swallow cancellation when both happen together
+                timer = None
+                if remaining is not None:
+                    timer = asyncio.get_running_loop().call_later(
+                        self._sleep_time(remaining), self._wake_event.set)
+                offset = clock.time() - clock.monotonic()
+                try:
+                    await self._wake_event.wait()
+                finally:
+                    if timer:
+                        timer.cancel()
+                self._check_clock(offset)
+                continue
+
+            for alarm_info in due:
+                self._ring(alarm_info)
+
+# Shared schedulers used by start_alarm and schedule_alarm
+scheduler = AlarmScheduler()
+async_scheduler = AsyncAlarmScheduler()
+
+def parse_alarm_time(alarm_time):
+    """Split an HH:MM or HH:MM:SS string into (hour, minute, second or None)"""
+    parts = [int(part) for part in alarm_time.split(":")]
+    if len(parts) == 2:
+        return parts[0], parts[1], None
+    hour, minute, second = parts
+    return hour, minute, second
+
+# Weekdays each named repeat rule rings on (Monday is 0)
+REPEAT_DAYS = {
+    "Once": set(range(7)),
+    "Daily": set(range(7)),
+    "Weekdays": {0, 1, 2, 3, 4},
+    "Weekends": {5, 6},
+}
+
+# Day names allowed in the day-of-week field of a cron rule, in cron order (Sunday is 0)
+CRON_DAY_NAMES = ("sun", "mon", "tue", "wed", "thu", "fri", "sat")
+
+@functools.lru_cache(maxsize=256)
+def parse_cron_field(field, low, high, names=None):
+    """
+    Expand one cron field ("*", "5", "1-5", "*/15", "mon,wed") into a frozenset of values.
+    Raises ValueError for anything outside low-high.
+    Cached, as saved alarms mostly share a few day fields.
+    """
+    values = set()
+    for part in field.lower().split(","):
+        part, _, step = part.partition("/")
+        step = int(step) if step else 1
+        if part == "*":
+            start, end = low, high
+        else:
+            start, _, end = part.partition("-")
+            start = names.index(start) if names and start in names else int(start)
+            end = (names.index(end) if names and end in names else int(end)) if end else start
+        if step < 1 or start < low or end > high or start > end:
+            raise ValueError(f"Invalid cron field: {field}")
+        values.update(range(start, end + 1, step))
+    return frozenset(values)
+
+class Recurrence:
+    """
+    Works out when an alarm goes off next.
+    rule: "Once", "Daily", "Weekdays", "Weekends" or a cron expression.
+    A cron expression either has all five fields ("30 6 * * 1-5") or just the
+    three day fields ("* * 1-5"), which use the hour and minute of alarm_time.
+    """
+    def __init__(self, alarm_time, rule="Once"):
+        self.rule = rule
+        hour, minute, second = parse_alarm_time(alarm_time)
+        if not (0 <= hour <= 23 and 0 <= minute <= 59 and 0 <= (second or 0) <= 59):
+            raise ValueError(f"Invalid alarm time: {alarm_time}")
+        self.precise = second is not None
+        self.second = second or 0
+        self.repeats = rule != "Once"
+        self._last_fire = None # (after, fire time) of the last first_fire call
+
+        # Which days of the month count when both day fields are restricted
+        self.month_days = set(range(1, 32))
+        self.months = set(range(1, 13))
+        self.any_day = True
+
+        if rule in REPEAT_DAYS:
+            self.week_days = REPEAT_DAYS[rule]
+            self.times = [(hour, minute)]
+        else:
+            fields = rule.split()
+            if len(fields) == 3:
+                fields = [str(minute), str(hour)] + fields
+            if len(fields) != 5:
+                raise ValueError(f"Cron rule needs 3 or 5 fields: {rule}")
+            minutes = parse_cron_field(fields[0], 0, 59)
+            hours = parse_cron_field(fields[1], 0, 23)
+            self.month_days = parse_cron_field(fields[2], 1, 31)
+            self.months = parse_cron_field(fields[3], 1, 12)
+            # Cron counts Sunday as 0 (or 7), Python counts Monday as 0
+            cron_days = parse_cron_field(fields[4], 0, 7, CRON_DAY_NAMES)
+            self.week_days = {(day - 1) % 7 for day in cron_days}
+            # Cron matches either day field when both are restricted
+            self.any_day = not (fields[2] != "*" and fields[4] != "*")
+            self.times = sorted((h, m) for h in hours for m in minutes)
+
+    def matches_day(self, day):
+        in_month = day.day in self.month_days
+        in_week = day.weekday() in self.week_days
+        if self.any_day:
+            return day.month in self.months and in_month and in_week
+        return day.month in self.months and (in_month or in_week)
+
+    def next_fire(self, after):
+        """
+        Get the first fire time at or after the datetime after,
+        as seconds since the epoch. Returns None if the rule never fires.
+        """
+        day = after.date()
+        # Four years and a day covers every date, including 29 February
+        for _ in range(4 * 366 + 1):
+            if self.matches_day(day):
+                for hour, minute in self.times:
+                    candidate = datetime.datetime(day.year, day.month, day.day, hour, minute, self.second)
+                    if candidate >= after:
+                        return candidate.timestamp()
+            day += datetime.timedelta(days=1)
+        return None
+
+    def first_fire(self, now=None):
+        """
+        Get the first time the alarm is due from now.
+        An HH:MM alarm set for the current minute goes off straight away.
+        """
+        now = now or datetime.datetime.now()
+        if not self.precise:
+            now = now.replace(second=0, microsecond=0)
+        # Alarms sharing this Recurrence (see get_recurrence) are usually restored in the same minute
+        last = self._last_fire
+        if last and last[0] == now:
+            return last[1]
+        deadline = self.next_fire(now)
+        self._last_fire = (now, deadline)
+        return deadline
+
+@functools.lru_cache(maxsize=1024)
+def get_recurrence(alarm_time, rule="Once"):
+    """
+    Shared Recurrence for an alarm time and rule.
+    A Recurrence never changes once built, so alarms set for the same time
+    reuse one instead of parsing the rule again (restoring thousands of alarms).
+    """
+    return Recurrence(alarm_time, rule)
+
+@functools.lru_cache(maxsize=1)
+def day_starts(today):
+    """Midnight of today and of the next eight days, as seconds since the epoch"""
+    return [datetime.datetime.combine(today + datetime.timedelta(days=offset), datetime.time()).timestamp()
+            for offset in range(9)]
+
+@functools.lru_cache(maxsize=256)
+def rule_week_days(repeat):
+    """
+    Weekdays a rule rings on at the alarm time, for named rules and three field
+    cron rules that only restrict the day of the week ("* * 1-5").
+    None for rules that need a full Recurrence.
+    """
+    if repeat in REPEAT_DAYS:
+        return REPEAT_DAYS[repeat]
+    fields = repeat.split()
+    if len(fields) == 3 and fields[0] == "*" and fields[1] == "*":
+        return frozenset((day - 1) % 7 for day in parse_cron_field(fields[2], 0, 7, CRON_DAY_NAMES))
+    return None
+
+def saved_first_fire(alarm_time, repeat="Once"):
+    """
+    First fire time of an alarm that passed check_alarm when it was saved.
+    Rules that ring at the alarm time on some weekdays are worked out from the
+    start of each day without building a Recurrence, so restoring thousands of
+    saved alarms stays fast. Other rules and days with a DST change fall back
+    to Recurrence.first_fire.
+    """
+    days = rule_week_days(repeat)
+    hour, minute, second = parse_alarm_time(alarm_time)
+    # A bad time is left to check_alarm to report
+    if days is not None and 0 <= hour <= 23 and 0 <= minute <= 59 and 0 <= (second or 0) <= 59:
+        now = time.time()
+        if second is None:
+            now -= now % 60 # An HH:MM alarm set for the current minute goes off straight away
+        today = datetime.date.fromtimestamp(now)
+        starts = day_starts(today)
+        weekday = today.weekday()
+        for offset in range(8):
+            if (weekday + offset) % 7 not in days:
+                continue
+            if starts[offset + 1] - starts[offset] != 86400:
+                break
+            deadline = starts[offset] + hour * 3600 + minute * 60 + (second or 0)
+            if deadline >= now:
+                return deadline
+    return check_alarm(alarm_time, repeat)[1]
+
+def prepare_ring(alarm_info, deadline):
+    """Call the alarm's prepare function for the ring at deadline, if it has one"""
+    if alarm_info.get('prepare'):
         try:
-            winsound.Beep(1000, length)
-            length += 25
-            time.sleep((length/1000)+0.2)
+            alarm_info['prepare'](deadline)
         except Exception as e:
-            print(f"Beep error: {e}")
-            time.sleep(1)
+            # A failed preparation must never stop the alarm ringing
+            print(f"Error preparing alarm {alarm_info['alarm_time']}: {e}")
+
+# Sets off Beep when the alarm is due then ends when the correct
+# solution is input
+def ring_alarm(alarm_info):
+    """Plays the alarm until the question is solved or the alarm is removed"""
+    # Each ring gets its own event so answering doesn't cancel later repeats
+    ringing = threading.Event()
+    alarm_info['ringing'] = ringing
+    if alarm_info['stop_event'].is_set():
+        return
+    prepare_ring(alarm_info, alarm_info['ring_deadline'])
+    on_alarm_trigger = alarm_info['on_alarm_trigger']
 
-# Checks current time every 5 seconds and sets off Beep when 
-# equal to alarm time then ends when the correct solution is input
-def alarm_clock(alarm_time, stop_event, on_alarm_trigger=None, check_solution=None,
-                volume=50, sound_file=None):
+    beeping_thread = threading.Thread(
+        target=audio.Beep,
+        args=(ringing, alarm_info['volume'], alarm_info['sound_file']),
+        daemon=True
+    )
+    beeping_thread.start()
+
+    # Updates the GUI until the user answers correctly
+    try:
+        while on_alarm_trigger and not ringing.is_set():
+            if on_alarm_trigger():
+                ringing.set() # Stops the Alarm
+    except BaseException:
+        ringing.set() # Stop the beeping if the question callback fails
+        raise
+    beeping_thread.join()
+    if alarm_info.get('fired'):
+        alarm_info['stop_event'].set() # One-off alarm is finished
+
+async def ring_alarm_async(alarm_info):
     """
-    Checks current time every 5 seconds and triggers alarm
-    volume: 0-100 percentage for alarm volume
-    sound_file: optional path to custom sound file
+    Coroutine version of ring_alarm for the asyncio scheduler.
+    on_alarm_trigger must be a coroutine function returning True once solved.
     """
-    while not stop_event.is_set():
-        # Get current time
-        now = datetime.datetime.now().strftime("%H:%M")
-        
-        if now == alarm_time:
-            beeping_thread = threading.Thread(
-                target=Beep, 
-                args=(stop_event, volume, sound_file), 
-                daemon=True
-            )
-            beeping_thread.start()
-
-
-            # Updates the GUI
-            if on_alarm_trigger:
-                result = on_alarm_trigger()
-                if result: # User answered correctly
-                    stop_event.set()
-                    beeping_thread.join()
-                    return # Stops the Alarm                
-
-        time.sleep(5)  # check every 5 seconds
+    import asyncio
+    ringing = asyncio.Event()
+    alarm_info['ringing'] = ringing
+    if alarm_info['stop_event'].is_set():
+        return
+    prepare_ring(alarm_info, alarm_info['ring_deadline'])
+    on_alarm_trigger = alarm_info['on_alarm_trigger']
+
+    beeping = asyncio.ensure_future(
+        audio.beep_async(ringing, alarm_info['volume'], alarm_info['sound_file']))
+
+    try:
+        while on_alarm_trigger and not ringing.is_set():
+            if await on_alarm_trigger():
+                ringing.set() # Stops the Alarm
+    except BaseException:
+        ringing.set()
+        raise
+    await beeping
+    if alarm_info.get('fired'):
+        alarm_info['stop_event'].set() # One-off alarm is finished
+
+def check_alarm(alarm_time, repeat="Once"):
+    """
+    Check an alarm before it is saved.
+    Returns its Recurrence and first fire time, raises ValueError for a bad
+    time or repeat rule, or a rule that never fires (e.g. "0 0 30 2 *").
+    """
+    recurrence = get_recurrence(alarm_time, repeat)
+    deadline = recurrence.first_fire()
+    if deadline is None:
+        raise ValueError(f"Repeat rule never fires: {repeat}")
+    return recurrence, deadline
+
+def create_alarm(alarm_time, on_alarm_trigger=None, volume=50, sound_file=None, repeat="Once", prepare=None,
+                 saved=False):
+    """
+    Build the alarm dictionary handed to a scheduler.
+    saved: the alarm was checked by check_alarm when it was saved, so only its
+           first fire time is worked out and its Recurrence is built when it first rings
+    """
+    if saved:
+        recurrence, deadline = None, saved_first_fire(alarm_time, repeat)
+    else:
+        recurrence, deadline = check_alarm(alarm_time, repeat)
+    return {
+        'alarm_time': alarm_time,
+        'repeat': repeat,
+        'recurrence': recurrence,
+        'deadline': deadline,
+        'stop_event': StopEvent(),
+        'on_alarm_trigger': on_alarm_trigger,
+        'volume': volume,
+        'sound_file': sound_file,
+        'prepare': prepare,
+    }
 
 def start_alarm(alarm_time, on_alarm_trigger=None, check_solution=None,
-                volume=50, sound_file=None):
+                volume=50, sound_file=None, repeat="Once", prepare=None, saved=False):
     """
-    Starts an alarm in a background thread to allow usage with GUI
+    Schedules an alarm on the shared background scheduler to allow usage with GUI
+    alarm_time: HH:MM, or HH:MM:SS for second precision
     volume: 0-100 percentage for alarm volume
     sound_file: optional path to custom sound file
+    repeat: "Once", "Daily", "Weekdays", "Weekends" or a cron rule (see Recurrence)
+    prepare: optional function called with the deadline of each ring before it rings,
+             at the audio pre-warm step and again as it starts ringing (e.g. to get questions ready)
+    saved: restoring an alarm that was checked when it was saved (see create_alarm)
     """
-    # Starts an alarm in a background thread to allow usage with GUI
-    stop_event = threading.Event()
-    alarm_thread = threading.Thread(
-        target=alarm_clock,
-        args=(alarm_time, stop_event, on_alarm_trigger, check_solution, volume, sound_file),
-        daemon=True
-    )
-    alarm_thread.start()
-    return {'thread': alarm_thread, 'stop_event': stop_event}
+    alarm_info = create_alarm(alarm_time, on_alarm_trigger, volume, sound_file, repeat, prepare, saved)
+    scheduler.add(alarm_info)
+    alarm_info['thread'] = scheduler.thread
+    return alarm_info
+
+async def schedule_alarm(alarm_time, on_alarm_trigger=None, volume=50, sound_file=None, repeat="Once",
+                         prepare=None, saved=False):
+    """
+    Schedules an alarm on the running asyncio loop and returns its alarm dictionary.
+    Takes the same arguments as start_alarm, but on_alarm_trigger must be
+    a coroutine function and the alarm rings without starting any threads.
+    """
+    return start_alarm_soon(alarm_time, on_alarm_trigger, volume, sound_file, repeat, prepare, saved)
+
+def start_alarm_soon(alarm_time, on_alarm_trigger=None, volume=50, sound_file=None, repeat="Once",
+                     prepare=None, saved=False):
+    """
+    Non-coroutine form of schedule_alarm for Qt slots running on a qasync loop.
+    Must be called while the asyncio loop is running.
+    """
+    alarm_info = create_alarm(alarm_time, on_alarm_trigger, volume, sound_file, repeat, prepare, saved)
+    async_scheduler.add(alarm_info)
+    return alarm_info
+
+def running_loop():
+    """Get the asyncio loop running in this thread (e.g. qasync's Qt loop), or None"""
+    # No loop can be running if asyncio was never imported
+    asyncio = sys.modules.get("asyncio")
+    if asyncio is None:
+        return None
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+def adding_many():
+    """
+    Add many alarms to both shared schedulers at once, e.g. restoring saved alarms:
+        with alarm.adding_many():
+            for saved in saved_alarms: alarm.start_alarm(..., saved=True)
+    """
+    stack = contextlib.ExitStack()
+    stack.enter_context(scheduler.adding_many())
+    stack.enter_context(async_scheduler.adding_many())
+    return stack
+
+def cancel_alarm(alarm_info):
+    """Stop an alarm returned by start_alarm or schedule_alarm and remove it from its scheduler"""
+    alarm_info.get('scheduler', scheduler).cancel(alarm_info)
+
+# Run headless with 'python -m alarm'
+if __name__ == "__main__":
+    import headless
+    headless.main()
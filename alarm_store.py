@@ -0,0 +1,75 @@
+"""
+Saves alarms to a local SQLite database so they survive a restart or crash
+"""
+import sqlite3
+import threading
+from pathlib import Path
+
+# Database file kept next to the program
+DB_PATH = Path(__file__).with_name("smart_alarm.db")
+
+class AlarmStore:
+    """
+    Persistent storage for alarms.
+    Adding or removing an alarm is one single-row write in its own
+    transaction. The database runs in WAL mode, so each write is a small
+    append to the journal that SQLite checkpoints (compacts) on its own.
+    """
+    def __init__(self, path=DB_PATH):
+        # Alarms are removed from the alarm thread as well as the GUI thread
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(str(path), check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("""
+            CREATE TABLE IF NOT EXISTS alarms (
+                id INTEGER PRIMARY KEY,
+                alarm_time TEXT NOT NULL,
+                alarm_time_display TEXT NOT NULL,
+                difficulty TEXT NOT NULL,
+                answer_mode TEXT NOT NULL,
+                volume INTEGER NOT NULL,
+                sound_file TEXT,
+                repeat_rule TEXT NOT NULL DEFAULT 'Once',
+                seed INTEGER
+            )
+        """)
+        # Databases saved before repeating alarms or question seeds existed lack those columns
+        columns = [row[1] for row in self.connection.execute("PRAGMA table_info(alarms)")]
+        if 'repeat_rule' not in columns:
+            self.connection.execute("ALTER TABLE alarms ADD COLUMN repeat_rule TEXT NOT NULL DEFAULT 'Once'")
+        if 'seed' not in columns:
+            self.connection.execute("ALTER TABLE alarms ADD COLUMN seed INTEGER")
+        self.connection.commit()
+
+    def add_alarm(self, alarm_time, alarm_time_display, difficulty="Easy",
+                  answer_mode="Multiple Choice", volume=50, sound_file=None, repeat_rule="Once", seed=None):
+        """
+        Save an alarm and return its id.
+        seed: seed the alarm's questions come from, each ring draws its own stream from it
+        """
+        with self.lock, self.connection:
+            cursor = self.connection.execute(
+                "INSERT INTO alarms (alarm_time, alarm_time_display, difficulty, answer_mode, volume, sound_file, repeat_rule, seed)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (alarm_time, alarm_time_display, difficulty, answer_mode, volume, sound_file, repeat_rule, seed)
+            )
+        return cursor.lastrowid
+
+    def remove_alarm(self, alarm_id):
+        """Delete a saved alarm by its id"""
+        with self.lock, self.connection:
+            self.connection.execute("DELETE FROM alarms WHERE id = ?", (alarm_id,))
+
+    def load_alarms(self):
+        """Get every saved alarm as a list of dictionaries, oldest first"""
+        with self.lock:
+            cursor = self.connection.execute(
+                "SELECT id, alarm_time, alarm_time_display, difficulty, answer_mode, volume, sound_file, repeat_rule, seed"
+                " FROM alarms ORDER BY id"
+            )
+            columns = [column[0] for column in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
@@ -0,0 +1,71 @@
+"""
+Checks typed answers against flashcard and math answers.
+Answers are normalized once into a set of keys, so checking what the
+user typed is a few hash lookups rather than repeated string work.
+"""
+import functools
+import re
+import unicodedata
+
+# Separates accepted answers on one card, e.g. "colour | color"
+ANSWER_SEPARATOR = "|"
+# Typos (one letter missing, extra or wrong) forgiven in flashcard answers
+DEFAULT_TOLERANCE = 1
+# Answers shorter than this must be typed exactly, "cat" shouldn't accept "car"
+MIN_TOLERANT_LENGTH = 5
+
+_whitespace = re.compile(r"\s+")
+_number = re.compile(r"[+-]?\d+")
+
+def normalize(text):
+    """Unicode NFKC, case folded, with whitespace trimmed and collapsed; whole numbers in canonical form"""
+    text = _whitespace.sub(" ", unicodedata.normalize("NFKC", str(text)).casefold()).strip()
+    if _number.fullmatch(text):
+        return str(int(text)) # "+012" and "１２" both become "12"
+    return text
+
+def is_number(text):
+    """Whether text is a whole number once normalized"""
+    return _number.fullmatch(normalize(text)) is not None
+
+def _deletions(key):
+    """Every string made by deleting one character from key"""
+    return {key[:i] + key[i + 1:] for i in range(len(key))}
+
+class AnswerKey:
+    """
+    Precomputed matcher for one card's answers.
+    answers: the answer text, with several accepted answers separated by "|".
+    tolerance: 1 to also accept a single typo in longer text answers
+    (using one-deletion neighbourhoods, so still only hash lookups), 0 for exact.
+    """
+    def __init__(self, answers, tolerance=0):
+        self.keys = {normalize(answer) for answer in str(answers).split(ANSWER_SEPARATOR)} - {""}
+        if not self.keys:
+            self.keys = {normalize(answers)}
+        self.tolerance = tolerance
+        # deleted form -> exact keys it came from, for keys long enough to allow typos
+        self._near = {}
+        if tolerance:
+            for key in self.keys:
+                if len(key) >= MIN_TOLERANT_LENGTH and not _number.fullmatch(key):
+                    self._near.setdefault(key, set()).add(key)
+                    for deleted in _deletions(key):
+                        self._near.setdefault(deleted, set()).add(key)
+
+    def matches(self, answer):
+        """Whether a typed answer is one of the accepted answers"""
+        answer = normalize(answer)
+        if answer in self.keys:
+            return True
+        if not self._near:
+            return False
+        # Missing letter, or a letter typed wrong, swapped or added
+        if answer in self._near:
+            return True
+        return any(deleted in self._near for deleted in _deletions(answer))
+
+@functools.lru_cache(maxsize=4096)
+def answer_key(answers, tolerance=0):
+    """Get the AnswerKey for an answer text, built once and reused"""
+    return AnswerKey(answers, tolerance)
@@ -0,0 +1,338 @@
+"""
+Alarm sound playback.
+The audio backend (pygame for sound files, winsound or the terminal bell
+for beeps) is chosen and started the first time a sound is needed, so
+importing this module is free and works on every platform.
+"""
+import array
+import collections
+import functools
+import hashlib
+import math
+import mmap
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+
+# Backend modules, filled in by get_backend()
+pygame = None
+winsound = None
+
+_backend = None # "pygame", "winsound" or "bell" once started
+_backend_lock = threading.Lock()
+
+# Memory limit for decoded sounds kept by the sample cache (bytes)
+SAMPLE_CACHE_LIMIT = 64 * 1024 * 1024
+# Folder to keep decoded sounds in as memory-mapped files, None to only cache in memory
+SAMPLE_CACHE_DIR = None
+
+# Beeps step up through these lengths (milliseconds), playing each one BEEPS_PER_STEP times.
+# Only a few fixed lengths are used so every beep buffer can be built ahead of time
+BEEP_STEPS = (500, 800, 1100, 1400, 1700, 2000)
+BEEPS_PER_STEP = 12
+
+def get_backend():
+    """Choose and start the audio backend on first use, returning its name"""
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                _backend = _start_backend()
+    return _backend
+
+def _start_backend():
+    global pygame, winsound
+    start = time.perf_counter()
+    backend = "bell"
+    try:
+        # Windows beeps, used whenever there is no sound file to play
+        import winsound as winsound_module
+        winsound = winsound_module
+        backend = "winsound"
+    except ImportError:
+        pass
+    try:
+        import pygame as pygame_module
+        pygame_module.mixer.init()
+        pygame = pygame_module
+        backend = "pygame"
+    except Exception as e: # ImportError, or pygame.error when there is no audio device
+        print(f"pygame not available ({e}), using {backend} beeps only")
+    print(f"Audio backend '{backend}' started in {(time.perf_counter() - start) * 1000:.0f} ms")
+    return backend
+
+def prewarm(sound_file=None, volume=50):
+    """
+    Start the audio backend in the background ahead of a known alarm,
+    and decode its sound file (or build all of its beeps) ahead of time.
+    """
+    def warm():
+        if get_backend() != "pygame":
+            return
+        try:
+            if sound_file and Path(sound_file).exists():
+                sample_cache.get(sound_file)
+            else:
+                for length in BEEP_STEPS:
+                    beep_sound(beep_frequency(volume), length, volume)
+        except Exception as e:
+            print(f"Error preparing alarm sound: {e}")
+
+    threading.Thread(target=warm, name="AudioPrewarm", daemon=True).start()
+
+class SampleCache:
+    """
+    Decoded sound files shared by every alarm that uses them.
+    Sounds are keyed by path, modification time and size, so an edited file
+    is decoded again. Once the decoded PCM goes over the memory limit the
+    least recently used sounds are dropped. With a disk folder, decoded PCM
+    is also saved there and memory-mapped back instead of decoding again.
+    """
+    def __init__(self, limit=SAMPLE_CACHE_LIMIT, disk_dir=SAMPLE_CACHE_DIR):
+        self.limit = limit
+        self.disk_dir = Path(disk_dir) if disk_dir else None
+        self._sounds = collections.OrderedDict() # key -> (pygame Sound, size in bytes)
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(sound_file):
+        path = Path(sound_file).resolve()
+        stat = path.stat()
+        return (str(path), stat.st_mtime_ns, stat.st_size)
+
+    def get(self, sound_file):
+        """Get the decoded pygame Sound for a file, decoding it on first use"""
+        key = self.key(sound_file)
+        with self._lock:
+            if key in self._sounds:
+                self._sounds.move_to_end(key)
+                self.hits += 1
+                return self._sounds[key][0]
+            self.misses += 1
+
+        # Decode outside the lock so other sounds can still be fetched
+        sound = self._load(key)
+        frequency, sample_format, channels = pygame.mixer.get_init()
+        size = int(sound.get_length() * frequency) * channels * abs(sample_format) // 8
+
+        with self._lock:
+            if key not in self._sounds:
+                self._sounds[key] = (sound, size)
+                self._size += size
+            # Drop least recently used sounds, but always keep the newest one
+            while self._size > self.limit and len(self._sounds) > 1:
+                _, (_, old_size) = self._sounds.popitem(last=False)
+                self._size -= old_size
+            return self._sounds[key][0]
+
+    def _disk_path(self, key):
+        # Raw PCM only fits the mixer format it was decoded for
+        name = hashlib.sha1(repr((key, pygame.mixer.get_init())).encode()).hexdigest()
+        return self.disk_dir / f"{name}.pcm"
+
+    def _load(self, key):
+        if self.disk_dir:
+            cached = self._disk_path(key)
+            if cached.exists():
+                with open(cached, "rb") as f:
+                    mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                return pygame.mixer.Sound(buffer=mapped)
+
+        sound = pygame.mixer.Sound(key[0])
+
+        if self.disk_dir:
+            # Write to a temporary file first so a crash never leaves half a sound
+            self.disk_dir.mkdir(parents=True, exist_ok=True)
+            temp = cached.with_suffix(".tmp")
+            temp.write_bytes(sound.get_raw())
+            os.replace(temp, cached)
+        return sound
+
+# Shared cache used by Beep and beep_async
+sample_cache = SampleCache()
+
+def _start_sound(sound_file, volume):
+    """
+    Start looping a sound file and return a function that stops it.
+    Plays a cached decoded copy, or streams the file if pygame can't decode it as a Sound.
+    """
+    try:
+        channel = sample_cache.get(sound_file).play(loops=-1)
+        if channel:
+            channel.set_volume(volume / 100.0)
+            return channel.stop
+    except Exception as e:
+        print(f"Error decoding sound file: {e}")
+
+    pygame.mixer.music.load(sound_file)
+    pygame.mixer.music.set_volume(volume / 100.0)
+    pygame.mixer.music.play(loops=-1)
+    return pygame.mixer.music.stop
+
+def beep_frequency(volume):
+    """Map volume (0-100) to beep frequency (500-2000 Hz)"""
+    return 500 + (volume * 15)
+
+def beep_lengths():
+    """Lengths of successive beeps in milliseconds, growing over time"""
+    for length in BEEP_STEPS[:-1]:
+        for _ in range(BEEPS_PER_STEP):
+            yield length
+    while True:
+        yield BEEP_STEPS[-1]
+
+def tone_samples(frequency, length, volume, rate, channels=1):
+    """
+    Signed 16-bit interleaved samples for a tone of length milliseconds.
+    Uses NumPy when it is installed, otherwise the array module.
+    """
+    count = rate * length // 1000
+    amplitude = 32767 * 0.8 * volume / 100
+    # Fade in and out over 5 ms so the beep doesn't click
+    fade = max(1, min(count // 2, rate // 200))
+    try:
+        import numpy
+    except ImportError:
+        numpy = None
+
+    if numpy is not None:
+        wave = numpy.sin(2 * numpy.pi * frequency * numpy.arange(count) / rate)
+        envelope = numpy.ones(count)
+        envelope[:fade] = numpy.linspace(0, 1, fade)
+        envelope[count - fade:] = numpy.linspace(1, 0, fade)
+        samples = (wave * envelope * amplitude).astype("<i2")
+        return numpy.repeat(samples, channels).tobytes()
+
+    samples = array.array("h", bytes(2 * count * channels))
+    step = 2 * math.pi * frequency / rate
+    for i in range(count):
+        value = int(math.sin(step * i) * amplitude * min(1, i / fade, (count - 1 - i) / fade))
+        for channel in range(channels):
+            samples[i * channels + channel] = value
+    if sys.byteorder == "big":
+        samples.byteswap() # PCM bytes are little-endian
+    return samples.tobytes()
+
+@functools.lru_cache(maxsize=128)
+def beep_sound(frequency, length, volume):
+    """
+    One beep followed by its pause as a pygame Sound, built once for each
+    frequency/length/volume and reused for every later beep.
+    """
+    get_backend()
+    rate, sample_format, channels = pygame.mixer.get_init()
+    if sample_format != -16:
+        raise ValueError(f"Unsupported mixer format: {sample_format}")
+    tone = tone_samples(frequency, length, volume, rate, channels)
+    pause = bytes(2 * channels * (rate * (length + 200) // 1000))
+    return pygame.mixer.Sound(buffer=tone + pause)
+
+def _beep_once(frequency, length):
+    """Play one blocking beep of length milliseconds on the simple backends"""
+    get_backend()
+    if winsound:
+        winsound.Beep(frequency, length)
+    else:
+        # Terminal bell when there is no sound library at all
+        sys.stdout.write("\a")
+        sys.stdout.flush()
+
+#Looping alarm sound, beeps increase in length over time
+
+def Beep(stop_event, volume=50, sound_file=None):
+    """
+    Play alarm sound - either custom sound file or beep.
+    volume: 0-100 percentage.
+    sound_file: path to audio file (mp3, wav, ogg).
+    """
+    if sound_file and get_backend() == "pygame" and Path(sound_file).exists():
+        # Play custom sound using pygame, looping until stopped
+        try:
+            stop_sound = _start_sound(sound_file, volume)
+            stop_event.wait()
+            stop_sound()
+            return
+        except Exception as e:
+            print(f"Error playing sound file: {e}")
+            print("Falling back to beep")
+
+    # Fallback to beeps that grow longer over time
+    base_freq = beep_frequency(volume)
+    synthesized = get_backend() == "pygame"
+
+    for length in beep_lengths():
+        if stop_event.is_set():
+            break
+        try:
+            if synthesized:
+                # Play a cached beep buffer, no blocking calls
+                sound = beep_sound(base_freq, length, volume)
+                channel = sound.play()
+                if stop_event.wait(sound.get_length()) and channel:
+                    channel.stop()
+            else:
+                _beep_once(base_freq, length)
+                stop_event.wait((length/1000)+0.2)
+        except Exception as e:
+            print(f"Beep error: {e}")
+            synthesized = False
+            stop_event.wait(1)
+
+async def beep_async(stop_event, volume=50, sound_file=None):
+    """
+    Coroutine version of Beep for the asyncio scheduler.
+    stop_event: asyncio.Event that ends the sound.
+    """
+    import asyncio # Only needed by the asyncio scheduler
+    loop = asyncio.get_running_loop()
+    # Starting the backend can block, so do it on the loop's shared executor
+    backend = await loop.run_in_executor(None, get_backend)
+
+    if sound_file and backend == "pygame" and Path(sound_file).exists():
+        # Play custom sound using pygame, looping until stopped.
+        # The first play may decode the file, so it runs on the executor too
+        try:
+            stop_sound = await loop.run_in_executor(None, _start_sound, sound_file, volume)
+            await stop_event.wait()
+            stop_sound()
+            return
+        except Exception as e:
+            print(f"Error playing sound file: {e}")
+            print("Falling back to beep")
+
+    async def wait(timeout):
+        """Wait for stop_event for up to timeout seconds, returning whether it is set"""
+        waiter = asyncio.ensure_future(stop_event.wait())
+        try:
+            await asyncio.wait([waiter], timeout=timeout)
+        finally:
+            waiter.cancel()
+        return stop_event.is_set()
+
+    # Fallback to beeps that grow longer over time
+    base_freq = beep_frequency(volume)
+    synthesized = backend == "pygame"
+
+    for length in beep_lengths():
+        if stop_event.is_set():
+            break
+        try:
+            if synthesized:
+                # Play a cached beep buffer; only building a new one touches the executor
+                sound = await loop.run_in_executor(None, beep_sound, base_freq, length, volume)
+                channel = sound.play()
+                if await wait(sound.get_length()) and channel:
+                    channel.stop()
+            else:
+                # Simple beeps block, so they run on the shared executor
+                await loop.run_in_executor(None, _beep_once, base_freq, length)
+                await wait((length/1000)+0.2)
+        except Exception as e:
+            print(f"Beep error: {e}")
+            synthesized = False
+            await wait(1)
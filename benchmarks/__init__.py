@@ -0,0 +1,6 @@
+"""
+Benchmarks for Smart Alarm.
+Run one with 'python -m benchmarks.<name>' from the project folder, e.g.
+'python -m benchmarks.scheduler'. Each saves its results as JSON in
+benchmarks/results so runs from different commits can be compared.
+"""
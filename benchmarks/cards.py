@@ -0,0 +1,76 @@
+"""
+Flashcard sampling micro-benchmark.
+Compares picking a random card by copying the keys (random.choice(list(cards)),
+as the flashcard code used to) against card_collection.CardCollection's uniform
+and weighted draws, and times CardCollection adds and swap-removes.
+
+Run with 'python -m benchmarks.cards', add --help for the options.
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import card_collection # Imports the card_collection module
+from benchmarks import report
+
+def rate(function, count, budget):
+    """Calls per second of function, stopping after count calls or budget seconds"""
+    calls = 0
+    start = time.perf_counter()
+    while calls < count:
+        function()
+        calls += 1
+        if calls % 16 == 0 and time.perf_counter() - start > budget:
+            break
+    return calls / (time.perf_counter() - start)
+
+def run(sizes, count, budget, seed=0):
+    results = {}
+    for size in sizes:
+        rng = random.Random(seed)
+        cards = {card_id: f"Answer {card_id}" for card_id in range(size)}
+        collection = card_collection.CardCollection(cards)
+        for card_id in range(0, size, 10):
+            collection.add(card_id, 4.0) # Every tenth card asked more often
+
+        next_id = size
+        def add_remove():
+            nonlocal next_id
+            collection.add(next_id)
+            collection.remove(collection.choice(rng))
+            next_id += 1
+
+        results[str(size)] = {
+            'list_keys_per_second': rate(lambda: rng.choice(list(cards.keys())), count, budget),
+            'choice_per_second': rate(lambda: collection.choice(rng), count, budget),
+            'weighted_choice_per_second': rate(lambda: collection.weighted_choice(rng), count, budget),
+            'add_remove_per_second': rate(add_remove, count, budget),
+        }
+    return results
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark random flashcard picks")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 10000, 1000000],
+                        help="cards in the collection (default: 100 10000 1000000)")
+    parser.add_argument("--count", type=int, default=100000, help="most calls per measurement (default: 100000)")
+    parser.add_argument("--budget", type=float, default=2.0,
+                        help="most seconds per measurement, for the slow cases (default: 2)")
+    parser.add_argument("--output", help="JSON file to save results to (default: benchmarks/results/cards-<commit>.json)")
+    parser.add_argument("--compare", metavar="JSON", help="earlier result file to compare against")
+    args = parser.parse_args(argv)
+
+    results = run(args.sizes, args.count, args.budget)
+    for size, result in results.items():
+        print(f"{size:>8} cards: list(keys) {result['list_keys_per_second']:>12,.0f}/s  "
+              f"choice {result['choice_per_second']:>12,.0f}/s  "
+              f"weighted {result['weighted_choice_per_second']:>12,.0f}/s  "
+              f"add+remove {result['add_remove_per_second']:>12,.0f}/s")
+    print(f"Saved to {report.save_results('cards', results, args.output)}")
+    if args.compare:
+        report.compare(args.compare, results)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""
+Recent-question collision report.
+Asks many questions at each difficulty through MathQuestionGenerator and
+reports how often a recently asked question was drawn again (a collision,
+skipped by the recent filter) and how often one had to be repeated anyway.
+
+Run with 'python -m benchmarks.collisions', add --help for the options.
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import math_quiz as mq # Imports math_quiz module (as mq)
+import recent_filter # Imports the recent_filter module
+from benchmarks import report
+
+def run(questions, window, seed=0):
+    results = {}
+    for difficulty in mq.DIFFICULTY_NAMES:
+        generator = mq.MathQuestionGenerator(difficulty, seed=seed)
+        generator.recent = recent_filter.RecentFilter(window, mode=f"math:{difficulty}")
+        start = time.perf_counter()
+        for _ in range(questions):
+            generator.generate_question()
+        results[difficulty] = {'questions_per_second': questions / (time.perf_counter() - start)}
+    for mode, stats in recent_filter.report().items():
+        results[mode.split(":", 1)[1]].update(stats)
+    return results
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Report recent-question collisions at each difficulty")
+    parser.add_argument("--questions", type=int, default=10000, help="questions per difficulty (default: 10000)")
+    parser.add_argument("--window", type=int, default=recent_filter.RECENT_WINDOW,
+                        help=f"recent questions remembered (default: {recent_filter.RECENT_WINDOW})")
+    parser.add_argument("--output", help="JSON file to save results to (default: benchmarks/results/collisions-<commit>.json)")
+    parser.add_argument("--compare", metavar="JSON", help="earlier result file to compare against")
+    args = parser.parse_args(argv)
+
+    results = run(args.questions, args.window)
+    for difficulty, result in results.items():
+        print(f"{difficulty}: {result['collisions_per_pick']:.2%} of picks collided, "
+              f"{result['repeats']} repeated anyway, {result['questions_per_second']:,.0f} questions/s")
+    print(f"Saved to {report.save_results('collisions', results, args.output)}")
+    if args.compare:
+        report.compare(args.compare, results)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Distractor engine benchmark.
+Runs math_quiz.distractors for every operand pair and operator in a range,
+negative operands included, and for the root of random expression tree
+questions, checking each result is unique, never the answer and no
+further from zero than the question's numbers allow. The worst case is
+checked by counting random draws per call, which doesn't depend on how
+busy the machine is; time per call is reported next to the old
+rejection-sampling loop.
+
+Run with 'python -m benchmarks.distractors', add --help for the options.
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import math_quiz as mq # Imports math_quiz module (as mq)
+from benchmarks import report
+
+def rejection_sampling(a, b, op, answer, count=3, rng=random):
+    """The loop generate_question used before the distractor engine, for comparison"""
+    options = [answer]
+    while len(options) < count + 1:
+        wrong = answer + rng.randint(-10, 10)
+        if wrong != answer and wrong not in options:
+            options.append(wrong)
+    return options[1:]
+
+class CountingRandom(random.Random):
+    """Random that counts how many random numbers have been drawn from it"""
+    draws = 0
+
+    def random(self):
+        self.draws += 1
+        return super().random()
+
+    def getrandbits(self, k):
+        # randint and choice draw through getrandbits instead of random
+        self.draws += 1
+        return super().getrandbits(k)
+
+def questions(largest, trees=2000, seed=0):
+    """
+    Every (a, b, op, answer) with a and b in -largest..largest (b not 0 for division),
+    then the root of trees random expressions for each tree difficulty
+    """
+    for op in mq.OPERATORS:
+        for a in range(-largest, largest + 1):
+            for b in range(-largest, largest + 1):
+                if b or op != '/':
+                    yield a, b, op, mq.OPERATOR_FUNCTIONS[op](a, b)
+    rng = random.Random(seed)
+    for fewest, most, leaf_range, operators in mq.TREE_DIFFICULTIES.values():
+        for _ in range(trees):
+            answer, op, left, right = mq.random_expression(rng, rng.randint(fewest, most), leaf_range, operators)
+            yield left[0], right[0], op, answer
+
+def plausible(a, b, answer, wrong):
+    """Whether a wrong answer is no further from zero than the question's numbers allow (no 9995 for 2 - -3)"""
+    return abs(wrong) <= abs(a) + abs(b) + abs(answer) + 10
+
+def count_draws(function, largest, seed=0):
+    """Random draws for each call of function on every question, checking its results"""
+    rng = CountingRandom(seed)
+    draws = []
+    for a, b, op, answer in questions(largest):
+        before = rng.draws
+        wrong = function(a, b, op, answer, rng=rng)
+        draws.append(rng.draws - before)
+        if len(set(wrong)) != 3 or answer in wrong or not all(plausible(a, b, answer, w) for w in wrong):
+            raise AssertionError(f"Bad distractors for {a} {op} {b}: {wrong}")
+    return draws
+
+def time_calls(function, largest, seed=0):
+    """Time function on every question"""
+    rng = random.Random(seed)
+    timings = []
+    for a, b, op, answer in questions(largest):
+        start = time.perf_counter()
+        function(a, b, op, answer, rng=rng)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+def run(largest):
+    results = {}
+    for name, function in (("distractors", mq.distractors), ("rejection_sampling", rejection_sampling)):
+        draws = count_draws(function, largest)
+        timings = time_calls(function, largest)
+        results[name] = {
+            'calls': len(timings),
+            'max_draws': max(draws),
+            'mean_draws': sum(draws) / len(draws),
+            'time_us': report.percentiles(timings, scale=1e6),
+        }
+    return results
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark distractor sampling worst-case time")
+    parser.add_argument("--largest", type=int, default=100, help="largest operand to try, either sign (default: 100)")
+    parser.add_argument("--output", help="JSON file to save results to (default: benchmarks/results/distractors-<commit>.json)")
+    parser.add_argument("--compare", metavar="JSON", help="earlier result file to compare against")
+    args = parser.parse_args(argv)
+
+    results = run(args.largest)
+    for name, result in results.items():
+        timing = result['time_us']
+        print(f"{name}: {result['calls']} calls, {result['max_draws']} draws at most "
+              f"({result['mean_draws']:.2f} mean), p50 {timing['p50']:.1f} us, p99 {timing['p99']:.1f} us")
+    print(f"Saved to {report.save_results('distractors', results, args.output)}")
+    if args.compare:
+        report.compare(args.compare, results)
+    # distractors() promises at most 2 * count draws (count is 3 here)
+    if results['distractors']['max_draws'] > 2 * 3:
+        sys.exit(f"Worst case {results['distractors']['max_draws']} draws is over the 6 draw bound")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Arithmetic evaluator benchmark.
+Compares working out question answers with eval against the safe
+math_quiz evaluator, with and without its compiled expression cache.
+
+Run with 'python -m benchmarks.evaluator', add --help for the options.
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import math_quiz as mq # Imports math_quiz module (as mq)
+from benchmarks import report
+
+def make_questions(count, length, seed=0):
+    """Build count random questions of length operands as (operands, ops, string)"""
+    rng = random.Random(seed)
+    questions = []
+    for _ in range(count):
+        operands = [rng.randint(1, 20) for _ in range(length)]
+        ops = "".join(rng.choice("+-*/") for _ in range(length - 1))
+        text = str(operands[0]) + "".join(f" {op} {operand}" for op, operand in zip(ops, operands[1:]))
+        questions.append((operands, ops, text))
+    return questions
+
+def rate(function, items, repeat):
+    """Best calls per second of function over items"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for item in items:
+            function(item)
+        best = min(best, time.perf_counter() - start)
+    return len(items) / best
+
+def run(count, repeat):
+    results = {}
+    for length in (2, 4):
+        questions = make_questions(count, length)
+        texts = [text for _, _, text in questions]
+        # eval does true division, so compare against floor division to match the quiz
+        python_texts = [text.replace("/", "//") for text in texts]
+        for (operands, ops, text), python_text in zip(questions[:1000], python_texts):
+            assert mq.evaluate(text) == eval(python_text), text
+
+        mq.compile_expression.cache_clear()
+        results[f"{length}_operands"] = {
+            'eval_per_second': rate(eval, python_texts, repeat),
+            'evaluate_uncached_per_second': rate(
+                lambda text: mq.compile_expression.__wrapped__(text)(), texts, repeat),
+            'evaluate_per_second': rate(mq.evaluate, texts, repeat),
+        }
+        if length == 2:
+            results[f"{length}_operands"]['calculate_answer_per_second'] = rate(
+                lambda q: mq.MathQuestionGenerator.calculate_answer(q[0][0], q[0][1], q[1]), questions, repeat)
+    return results
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark eval against the math_quiz evaluator")
+    parser.add_argument("--count", type=int, default=1000, help="questions per run (default: 1000)")
+    parser.add_argument("--repeat", type=int, default=5, help="runs to take the best of (default: 5)")
+    parser.add_argument("--output", help="JSON file to save results to (default: benchmarks/results/evaluator-<commit>.json)")
+    parser.add_argument("--compare", metavar="JSON", help="earlier result file to compare against")
+    args = parser.parse_args(argv)
+
+    results = run(args.count, args.repeat)
+    for name, result in results.items():
+        speedup = result['evaluate_per_second'] / result['eval_per_second']
+        print(f"{name}: " + ", ".join(f"{key[:-11]} {value:,.0f}/s" for key, value in result.items())
+              + f" (cached evaluate at {speedup:.1f}x the speed of eval)")
+    print(f"Saved to {report.save_results('evaluator', results, args.output)}")
+    if args.compare:
+        report.compare(args.compare, results)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+"""
+Question generation benchmark.
+Measures math_quiz.generate_question, MathQuestionGenerator.generate_question
+(on its own and drawing from question banks of several sizes) and
+spaced_repetition.CardScheduler.next_card, which the question dialog picks
+flashcards with, on saved decks of several sizes. For each it reports
+questions per second, p99 latency and the memory blocks and bytes allocated
+per question (tracemalloc), and for flashcards how long building the review
+queue takes. Expression tree difficulties are also generated in batches,
+failing the run if that is slower than EXPRESSION_FLOOR per second.
+Runs without PyQt, so it works on CI machines.
+
+Run with 'python -m benchmarks.questions', add --help for the options.
+"""
+import argparse
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import flashcard_store # Imports the flashcard_store module
+import math_quiz as mq # Imports math_quiz module (as mq)
+import question_bank # Imports the question_bank module
+import recent_filter # Imports the recent_filter module
+import spaced_repetition # Imports the spaced_repetition module
+from benchmarks import report
+
+# Expression tree questions generate_questions must make per second in a batch
+EXPRESSION_FLOOR = 50000
+
+def measure(function, count):
+    """Throughput, latency percentiles (microseconds) and allocations per call of function"""
+    for _ in range(min(count, 100)):
+        function() # Warm up caches
+
+    start = time.perf_counter()
+    for _ in range(count):
+        function()
+    per_second = count / (time.perf_counter() - start)
+
+    timings = []
+    for _ in range(min(count, 10000)):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+
+    # Allocations still held by the results, e.g. the question tuples themselves
+    calls = min(count, 1000)
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    results = [function() for _ in range(calls)]
+    allocated = tracemalloc.take_snapshot().compare_to(before, "filename")
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    del results
+
+    latency = report.percentiles(timings, scale=1e6)
+    return {
+        'per_second': per_second,
+        'p50_us': latency['p50'],
+        'p99_us': latency['p99'],
+        'blocks_per_question': sum(stat.count_diff for stat in allocated) / calls,
+        'bytes_per_question': sum(stat.size_diff for stat in allocated) / calls,
+        'peak_bytes': peak,
+    }
+
+def bench_math(difficulties, count):
+    results = {}
+    for difficulty in difficulties:
+        generator = mq.MathQuestionGenerator(difficulty, seed=0)
+        results[difficulty] = {
+            'generate_question': measure(lambda: mq.generate_question(difficulty), count),
+            'generator': measure(generator.generate_question, count),
+        }
+    return results
+
+def bench_expressions(difficulties, count, repeats=3):
+    """Expression tree questions per second from generate_questions, best of repeats batches of count"""
+    results = {}
+    for difficulty in difficulties:
+        if difficulty not in mq.TREE_DIFFICULTIES:
+            continue
+        best = None
+        for repeat in range(repeats):
+            rng = random.Random(repeat)
+            start = time.perf_counter()
+            mq.generate_questions(difficulty, count, rng)
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        results[difficulty] = {'per_second': count / best}
+    return results
+
+def bench_banks(sizes, count, folder):
+    results = {}
+    for size in sizes:
+        path = Path(folder) / f"bank-{size}.saqb"
+        question_bank.write_bank(path, question_bank.math_entries("Medium", size, seed=0), label="Medium")
+        bank = question_bank.QuestionBank(path)
+        generator = mq.MathQuestionGenerator("Medium", seed=0, bank=bank)
+        results[str(size)] = measure(generator.generate_question, count)
+        bank.close()
+    return results
+
+def bench_flashcards(sizes, count, folder):
+    results = {}
+    for size in sizes:
+        store = flashcard_store.FlashcardStore(Path(folder) / f"cards-{size}.db")
+        rng = random.Random(0)
+        # Half the cards are new, the rest were reviewed and are due within two weeks either side of now
+        store.add_cards(("Default", f"Question {i}", f"Answer {i}") for i in range(size))
+        now = time.time()
+        with store.lock, store.connection:
+            store.connection.executemany("UPDATE cards SET due = ? WHERE id = ?",
+                                         ((now + rng.uniform(-14, 14) * spaced_repetition.DAY, i + 1)
+                                          for i in range(0, size, 2)))
+        scheduler = spaced_repetition.CardScheduler(store)
+        start = time.perf_counter()
+        scheduler.load() # Done by start_loading() when the GUI starts
+        load_ms = (time.perf_counter() - start) * 1000
+        recent = recent_filter.RecentFilter(mode="flashcards")
+        results[str(size)] = {'load_ms': load_ms, **measure(lambda: scheduler.next_card(recent), count)}
+        store.close()
+    return results
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark question generation and flashcard scheduling")
+    parser.add_argument("--count", type=int, default=20000, help="calls per measurement (default: 20000)")
+    parser.add_argument("--difficulties", nargs="+", default=mq.DIFFICULTY_NAMES, choices=mq.DIFFICULTY_NAMES)
+    parser.add_argument("--bank-sizes", type=int, nargs="+", default=[1000, 100000],
+                        help="question bank sizes to draw from (default: 1000 100000)")
+    parser.add_argument("--card-counts", type=int, nargs="+", default=[10, 1000, 100000],
+                        help="flashcard deck sizes to pick from (default: 10 1000 100000)")
+    parser.add_argument("--output", help="JSON file to save results to (default: benchmarks/results/questions-<commit>.json)")
+    parser.add_argument("--compare", metavar="JSON", help="earlier result file to compare against")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as folder:
+        results = {
+            'math': bench_math(args.difficulties, args.count),
+            'expressions': bench_expressions(args.difficulties, args.count),
+            'banks': bench_banks(args.bank_sizes, args.count, folder),
+            'flashcards': bench_flashcards(args.card_counts, args.count, folder),
+        }
+
+    def show(name, result):
+        print(f"{name:<32} {result['per_second']:>10,.0f}/s  p99 {result['p99_us']:>8.1f} us  "
+              f"{result['blocks_per_question']:>5.1f} blocks  {result['bytes_per_question']:>6.0f} B per question")
+
+    for difficulty, cases in results['math'].items():
+        for case, result in cases.items():
+            show(f"{difficulty} {case}", result)
+    for difficulty, result in results['expressions'].items():
+        print(f"{difficulty + ' expression batch':<32} {result['per_second']:>10,.0f}/s")
+    for size, result in results['banks'].items():
+        show(f"bank of {size}", result)
+    for size, result in results['flashcards'].items():
+        show(f"{size} flashcards (queue built in {result['load_ms']:.0f} ms)", result)
+    print(f"Saved to {report.save_results('questions', results, args.output)}")
+    if args.compare:
+        report.compare(args.compare, results)
+    slow = [difficulty for difficulty, result in results['expressions'].items()
+            if result['per_second'] < EXPRESSION_FLOOR]
+    if slow:
+        sys.exit(f"{', '.join(slow)} expressions generated slower than {EXPRESSION_FLOOR:,}/s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Shared helpers for saving and comparing benchmark results
+"""
+import datetime
+import json
+import platform
+import subprocess
+import sys
+from pathlib import Path
+
+# Default folder for result files (not committed)
+RESULTS_DIR = Path(__file__).with_name("results")
+
+def git_commit():
+    """Get the short hash of the checked out commit, or None outside a git checkout"""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=Path(__file__).parent,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def percentiles(samples, scale=1000):
+    """Summarise samples (seconds) as mean/p50/p90/p99/max, in milliseconds by default"""
+    samples = sorted(samples)
+    if not samples:
+        return {'count': 0}
+    def at(fraction):
+        return samples[min(len(samples) - 1, int(len(samples) * fraction))] * scale
+    return {
+        'count': len(samples),
+        'mean': sum(samples) / len(samples) * scale,
+        'p50': at(0.5),
+        'p90': at(0.9),
+        'p99': at(0.99),
+        'max': samples[-1] * scale,
+    }
+
+def save_results(name, results, output=None):
+    """
+    Save results with the commit and machine they came from.
+    Writes to output, or benchmarks/results/<name>-<commit>.json by default.
+    Returns the path written.
+    """
+    commit = git_commit()
+    report = {
+        'benchmark': name,
+        'commit': commit,
+        'date': datetime.datetime.now().isoformat(timespec="seconds"),
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+        'results': results,
+    }
+    path = Path(output) if output else RESULTS_DIR / f"{name}-{commit or 'local'}.json"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(report, indent=2) + "\n")
+    return path
+
+def compare(old_path, results):
+    """
+    Print each number in results next to the same number from an earlier
+    result file, with the change in percent.
+    """
+    old = json.loads(Path(old_path).read_text())
+    print(f"Compared with {old.get('commit') or old_path}:")
+
+    def walk(new, previous, prefix):
+        for key, value in new.items():
+            if isinstance(value, dict) and isinstance(previous.get(key), dict):
+                walk(value, previous[key], f"{prefix}{key}.")
+            elif isinstance(value, (int, float)) and isinstance(previous.get(key), (int, float)):
+                before = previous[key]
+                change = f"{(value - before) / before * 100:+.1f}%" if before else "n/a"
+                print(f"  {prefix}{key}: {before:.4g} -> {value:.4g} ({change})")
+
+    walk(results, old['results'], "")
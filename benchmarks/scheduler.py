@@ -0,0 +1,229 @@
+"""
+Alarm scheduler benchmark.
+Runs the AlarmScheduler against a virtual clock, so a whole day of alarms
+fires in seconds, and reports for each alarm count:
+- schedule and cancel throughput (alarms per second)
+- firing latency: real time from an alarm's deadline being reached to it ringing
+- jitter: how late the scheduler saw each alarm fire on its own clock
+- threads started by the scheduler itself. Alarms don't really ring here,
+  a real ring adds 2 more threads per ringing alarm (ring_alarm and audio.Beep)
+- idle wakeups per minute while no alarm is due
+
+Run with 'python -m benchmarks.scheduler', add --help for the options.
+"""
+import argparse
+import random
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import alarm # Imports the alarm module
+from benchmarks import report
+
+# Virtual wall clock starts at midnight on 1 January 2024 (local time)
+VIRTUAL_START = time.mktime((2024, 1, 1, 0, 0, 0, 0, 1, -1))
+
+class VirtualClock:
+    """
+    Fake clock for AlarmScheduler that only moves when advanced.
+    While the scheduler sleeps the benchmark advances the clock straight to
+    the time it asked to wake at, so no real time is spent waiting.
+    """
+    def __init__(self, start=VIRTUAL_START):
+        self.start = start
+        self.now = 0.0 # Seconds since start
+        self.wakeups = 0
+        self.sleeping_until = None # Virtual time the scheduler wakes at, None for no timeout
+        self.advanced_at = time.perf_counter() # Real time of the last advance
+        self.idle = threading.Event() # Set while the scheduler is sleeping
+        self.condition = None
+
+    def time(self):
+        return self.start + self.now
+
+    def monotonic(self):
+        return self.now
+
+    def wait(self, condition, timeout=None):
+        self.condition = condition
+        self.sleeping_until = None if timeout is None else self.now + timeout
+        self.idle.set()
+        condition.wait()
+        self.idle.clear()
+        self.wakeups += 1
+
+    def wait_idle(self):
+        """Block until the scheduler is asleep again"""
+        if not self.idle.wait(10):
+            raise RuntimeError("Scheduler did not go back to sleep")
+
+    def advance(self):
+        """
+        Move the clock to the sleeping scheduler's wake time and wake it.
+        Returns False if the scheduler is sleeping with no timeout.
+        """
+        self.wait_idle()
+        with self.condition:
+            if self.sleeping_until is None:
+                return False
+            self.now = max(self.now, self.sleeping_until)
+            self.idle.clear()
+            self.advanced_at = time.perf_counter()
+            self.condition.notify()
+        return True
+
+class BenchmarkScheduler(alarm.AlarmScheduler):
+    """
+    AlarmScheduler that records when alarms ring instead of playing them,
+    so no ring threads are started
+    """
+    def __init__(self, clock):
+        super().__init__(clock)
+        self.latencies = []
+        self.threads_started = 0
+
+    def _start(self):
+        if self.thread is None or not self.thread.is_alive():
+            self.threads_started += 1
+        super()._start()
+
+    def _ring(self, alarm_info):
+        self.latencies.append(time.perf_counter() - self.clock.advanced_at)
+
+def make_alarms(count, span, seed=0):
+    """
+    Build count alarm dictionaries due at random whole seconds within
+    span seconds of the virtual start.
+    """
+    rng = random.Random(seed)
+    alarms = []
+    for _ in range(count):
+        offset = rng.randrange(1, int(span))
+        hour, rest = divmod(offset % 86400, 3600)
+        alarm_time = f"{hour:02d}:{rest // 60:02d}:{rest % 60:02d}"
+        alarm_info = alarm.create_alarm(alarm_time)
+        alarm_info['deadline'] = VIRTUAL_START + offset
+        alarms.append(alarm_info)
+    return alarms
+
+def bench_schedule_cancel(count):
+    """Time adding then cancelling count alarms on a running scheduler"""
+    clock = VirtualClock()
+    scheduler = BenchmarkScheduler(clock)
+    alarms = make_alarms(count, 86400)
+    threads_before = threading.active_count()
+
+    start = time.perf_counter()
+    for alarm_info in alarms:
+        scheduler.add(alarm_info)
+    schedule_time = time.perf_counter() - start
+    threads = threading.active_count() - threads_before
+
+    clock.wait_idle()
+    start = time.perf_counter()
+    for alarm_info in alarms:
+        scheduler.cancel(alarm_info)
+    cancel_time = time.perf_counter() - start
+
+    return {
+        'schedule_per_second': count / schedule_time,
+        'cancel_per_second': count / cancel_time,
+        'scheduler_threads': threads,
+        'threads_started': scheduler.threads_started,
+    }
+
+# Repeat rules saved alarms are restored with in bench_restore
+RESTORE_RULES = ["Once", "Daily", "Weekdays", "Weekends", "* * 1-5", "30 6 * * 1-5"]
+
+def bench_restore(count, seed=0):
+    """Time restoring count saved alarms with random times and repeat rules, as at startup"""
+    rng = random.Random(seed)
+    saved = [(f"{rng.randrange(24):02d}:{rng.randrange(60):02d}", rng.choice(RESTORE_RULES))
+             for _ in range(count)]
+    alarm.get_recurrence.cache_clear()
+    scheduler = BenchmarkScheduler(VirtualClock())
+
+    start = time.perf_counter()
+    with scheduler.adding_many():
+        for alarm_time, repeat in saved:
+            scheduler.add(alarm.create_alarm(alarm_time, repeat=repeat, saved=True))
+    return {'restore_ms': (time.perf_counter() - start) * 1000}
+
+def bench_firing(count):
+    """Fire count alarms spread over one virtual day, recording the latency of each"""
+    clock = VirtualClock()
+    scheduler = BenchmarkScheduler(clock)
+    for alarm_info in make_alarms(count, 86400):
+        scheduler.add(alarm_info)
+
+    start = time.perf_counter()
+    while len(scheduler.latencies) < count and clock.advance():
+        pass
+    clock.wait_idle()
+
+    return {
+        'fired': len(scheduler.latencies),
+        'latency_ms': report.percentiles(scheduler.latencies),
+        'jitter_ms': scheduler.jitter_stats(),
+        'real_seconds': time.perf_counter() - start,
+        'virtual_hours': clock.now / 3600,
+    }
+
+def bench_idle(count, minutes=10):
+    """Count scheduler wakeups while count alarms are set but none is due for an hour"""
+    clock = VirtualClock()
+    scheduler = BenchmarkScheduler(clock)
+    for alarm_info in make_alarms(count, 86400):
+        alarm_info['deadline'] += 3600
+        scheduler.add(alarm_info)
+
+    clock.wait_idle()
+    wakeups = clock.wakeups
+    end = clock.now + minutes * 60
+    while clock.now < end and clock.advance():
+        pass
+    clock.wait_idle()
+
+    return {'wakeups_per_minute': (clock.wakeups - wakeups) / (clock.now / 60)}
+
+def run(sizes):
+    results = {}
+    for count in sizes:
+        print(f"Benchmarking {count} alarms...")
+        results[str(count)] = {
+            **bench_schedule_cancel(count),
+            **bench_restore(count),
+            **bench_firing(count),
+            **bench_idle(count),
+        }
+    return results
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the alarm scheduler with a virtual clock")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 1000, 100000],
+                        help="alarm counts to benchmark (default: 10 1000 100000)")
+    parser.add_argument("--output", help="JSON file to save results to (default: benchmarks/results/scheduler-<commit>.json)")
+    parser.add_argument("--compare", metavar="JSON", help="earlier result file to compare against")
+    args = parser.parse_args(argv)
+
+    # No audio in benchmarks, the backend would be started ahead of each alarm
+    alarm.AUDIO_PREWARM_SECONDS = 0
+
+    results = run(args.sizes)
+    for count, result in results.items():
+        latency = result['latency_ms']
+        print(f"{count:>7} alarms: schedule {result['schedule_per_second']:,.0f}/s, "
+              f"cancel {result['cancel_per_second']:,.0f}/s, "
+              f"restore {result['restore_ms']:.1f} ms, "
+              f"fire p50 {latency['p50']:.3f} ms p99 {latency['p99']:.3f} ms, "
+              f"jitter p99 {result['jitter_ms'].get('p99_ms', 0):.3f} ms, "
+              f"{result['scheduler_threads']} scheduler thread(s) (+2 per ringing alarm), "
+              f"{result['wakeups_per_minute']:.1f} idle wakeups/min")
+    print(f"Saved to {report.save_results('scheduler', results, args.output)}")
+    if args.compare:
+        report.compare(args.compare, results)
+
+if __name__ == "__main__":
+    main()
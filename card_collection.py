@@ -0,0 +1,79 @@
+"""
+Set of flashcard ids that a random card can be drawn from in O(1)
+"""
+import random
+
+class CardCollection:
+    """
+    Card ids kept in an array, with an id -> slot map.
+    Adding appends, removing moves the last id into the freed slot (swap-remove),
+    so adds, removes and uniform draws are all O(1) and nothing is copied to pick a card.
+    Each card can have a weight, e.g. to ask harder cards more often; weighted
+    draws use rejection sampling, which is O(1) expected while weights stay within
+    a small factor of each other.
+    """
+    def __init__(self, card_ids=(), weight=1.0):
+        self._ids = []
+        self._weights = []
+        self._slots = {} # card id -> index in _ids
+        self._max_weight = 0.0 # Upper bound on every weight, only ever raised
+        for card_id in card_ids:
+            self.add(card_id, weight)
+
+    def __len__(self):
+        return len(self._ids)
+
+    def __contains__(self, card_id):
+        return card_id in self._slots
+
+    def __iter__(self):
+        return iter(self._ids)
+
+    def __getitem__(self, i):
+        # Lets random.choice draw straight from the collection
+        return self._ids[i]
+
+    def add(self, card_id, weight=1.0):
+        """Add a card, or change its weight if it's already in the collection"""
+        if weight <= 0:
+            raise ValueError("card weight must be positive")
+        slot = self._slots.get(card_id)
+        if slot is None:
+            self._slots[card_id] = len(self._ids)
+            self._ids.append(card_id)
+            self._weights.append(weight)
+        else:
+            self._weights[slot] = weight
+        self._max_weight = max(self._max_weight, weight)
+
+    def remove(self, card_id):
+        """Remove a card, raising KeyError if it isn't in the collection"""
+        slot = self._slots.pop(card_id)
+        last_id = self._ids.pop()
+        last_weight = self._weights.pop()
+        if last_id != card_id:
+            self._ids[slot] = last_id
+            self._weights[slot] = last_weight
+            self._slots[last_id] = slot
+        if not self._ids:
+            self._max_weight = 0.0
+
+    def discard(self, card_id):
+        """Remove a card if it's in the collection"""
+        if card_id in self._slots:
+            self.remove(card_id)
+
+    def choice(self, rng=random):
+        """Draw a card id, every card equally likely"""
+        if not self._ids:
+            raise IndexError("cannot choose from an empty card collection")
+        return self._ids[int(rng.random() * len(self._ids))]
+
+    def weighted_choice(self, rng=random):
+        """Draw a card id with probability proportional to its weight"""
+        if not self._ids:
+            raise IndexError("cannot choose from an empty card collection")
+        while True:
+            slot = int(rng.random() * len(self._ids))
+            if rng.random() * self._max_weight < self._weights[slot]:
+                return self._ids[slot]
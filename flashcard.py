@@ -1,21 +1,39 @@
 import random
+import answer_match # Imports the answer_match module
+import card_collection # Imports the card_collection module
+import flashcard_store # Imports the flashcard_store module
 
-Flashcards = {
+def createCards (question,answer,store):
+    """Save a card to a flashcard_store.FlashcardStore and return its id"""
+    return store.add_card(question, answer)
 
-}
 
-def createCards (question,answer):
-    Flashcards[question]=answer
-    return dictionary
+def pick_card (cards, recent=None, rng=random):
+    """
+    Pick a random card from a card_collection.CardCollection in O(1), or from any
+    other collection of card ids (or a question -> answer dictionary's questions),
+    which is copied first.
+    recent: optional recent_filter.RecentFilter to skip cards asked recently
+    """
+    if isinstance(cards, card_collection.CardCollection):
+        if recent is None:
+            return cards.choice(rng)
+        return recent.pick(lambda: cards.choice(rng))
+    questions = list(cards)
+    if recent is None:
+        return rng.choice(questions)
+    return recent.pick(lambda: rng.choice(questions))
 
 
-def askQuestion ():
-    question = random.choice(list(Flashcards.keys()))
-    answer = input(f"What is the answer for '{question}'?")
+def askQuestion (store=None):
+    store = store or flashcard_store.FlashcardStore()
+    card = store.get_card(pick_card(store.cards()))
+    answer = input(f"What is the answer for '{card['question']}'?")
 
-    correct_value = Flashcards[question]
+    correct_value = card['answer']
 
-    if answer == correct_value:
+    # Same matching as the question dialog: case, spacing and one typo are forgiven
+    if answer_match.answer_key(correct_value, answer_match.DEFAULT_TOLERANCE).matches(answer):
         print("correct")
     else:
         print("Try again!")
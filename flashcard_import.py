@@ -0,0 +1,177 @@
+"""
+Bulk import of flashcard decks into a flashcard_store.FlashcardStore.
+Reads CSV and TSV files (a question column then an answer column),
+Anki "Notes in Plain Text" exports (with their #separator/#html/#deck column
+headers) and Anki .apkg packages. Files are streamed and saved in batches,
+so memory use stays flat whatever the size of the deck.
+
+Import a deck with 'python flashcard_import.py deck.csv --deck Spanish'.
+"""
+import argparse
+import csv
+import html
+import io
+import re
+import shutil
+import sqlite3
+import tempfile
+import zipfile
+from pathlib import Path
+import flashcard_store # Imports the flashcard_store module
+
+# Cards saved per transaction
+BATCH_SIZE = 5000
+
+# Anki's names for the #separator header
+ANKI_SEPARATORS = {"tab": "\t", "comma": ",", "semicolon": ";", "pipe": "|", "space": " "}
+# Anki columns that hold note details rather than fields
+ANKI_META_COLUMNS = ("deck", "notetype", "tags", "guid")
+# Anki separates a note's fields with this character
+ANKI_FIELD_SEPARATOR = "\x1f"
+# Errors an unreadable or malformed deck file can raise
+IMPORT_ERRORS = (OSError, ValueError, csv.Error, sqlite3.Error, zipfile.BadZipFile)
+
+_tags = re.compile(r"<[^>]*>")
+_line_breaks = re.compile(r"<br\s*/?>|</div>", re.IGNORECASE)
+
+def strip_html(text):
+    """Plain text of an Anki field: tags removed, entities decoded"""
+    text = _tags.sub("", _line_breaks.sub(" ", text))
+    return " ".join(html.unescape(text).split())
+
+class _Progress:
+    """How far through its file an import has read, in bytes of a text file or rows of a package"""
+    def __init__(self):
+        self.raw = None # Open binary file, whose position is the bytes read
+        self.size = 0
+        self.done = 0
+
+    def fraction(self):
+        if self.raw is not None and not self.raw.closed:
+            self.done = self.raw.tell()
+        return min(1.0, self.done / self.size) if self.size else 1.0
+
+def _read_text(path, deck, progress):
+    """Yield (deck, question, answer) from a CSV, TSV or Anki text export"""
+    path = Path(path)
+    with open(path, "rb") as raw:
+        progress.raw, progress.size = raw, path.stat().st_size
+        text = io.TextIOWrapper(raw, encoding="utf-8-sig", newline="")
+
+        # Anki exports start with "#key:value" header lines
+        headers = {}
+        line = text.readline()
+        while line.startswith("#") and ":" in line:
+            key, value = line[1:].rstrip("\r\n").split(":", 1)
+            headers[key.strip().lower()] = value.strip()
+            line = text.readline()
+
+        if "separator" in headers:
+            separator = ANKI_SEPARATORS.get(headers["separator"].lower(), headers["separator"])
+        elif path.suffix.lower() == ".csv":
+            separator = ","
+        elif path.suffix.lower() in (".tsv", ".txt"):
+            separator = "\t"
+        else:
+            try:
+                separator = csv.Sniffer().sniff(line, delimiters=",;\t|").delimiter
+            except csv.Error:
+                separator = ","
+        is_html = headers.get("html", "").lower() == "true"
+        # Header columns are numbered from 1
+        meta = {name: int(headers[f"{name} column"]) - 1
+                for name in ANKI_META_COLUMNS if f"{name} column" in headers}
+
+        def lines():
+            if line:
+                yield line
+            yield from text
+
+        for row in csv.reader(lines(), delimiter=separator):
+            fields = [field for i, field in enumerate(row) if i not in meta.values()]
+            if len(fields) < 2:
+                continue # Blank lines and notes without an answer
+            question, answer = fields[0], fields[1]
+            if is_html:
+                question, answer = strip_html(question), strip_html(answer)
+            if not question.strip() or not answer.strip():
+                continue
+            row_deck = row[meta["deck"]] if "deck" in meta and meta["deck"] < len(row) else None
+            yield row_deck or deck, question.strip(), answer.strip()
+        progress.done = progress.size
+
+def _read_apkg(path, deck, progress):
+    """Yield (deck, question, answer) from the first two fields of every note in an Anki package"""
+    with zipfile.ZipFile(path) as package, tempfile.TemporaryDirectory() as folder:
+        names = set(package.namelist())
+        # Newer Anki versions also write a compressed collection.anki21b, older ones only these
+        name = next((name for name in ("collection.anki21", "collection.anki2") if name in names), None)
+        if name is None:
+            raise ValueError(f"No readable Anki collection in {path}, export it with 'Support older Anki versions'")
+        collection = Path(folder) / name
+        with package.open(name) as source, open(collection, "wb") as target:
+            shutil.copyfileobj(source, target)
+
+        connection = sqlite3.connect(str(collection))
+        try:
+            progress.size = connection.execute("SELECT COUNT(*) FROM notes").fetchone()[0]
+            for i, (fields,) in enumerate(connection.execute("SELECT flds FROM notes")):
+                progress.done = i + 1
+                fields = fields.split(ANKI_FIELD_SEPARATOR)
+                if len(fields) < 2:
+                    continue
+                question, answer = strip_html(fields[0]), strip_html(fields[1])
+                if question and answer:
+                    yield deck, question, answer
+        finally:
+            connection.close()
+
+def import_cards(store, path, deck=flashcard_store.DEFAULT_DECK, batch_size=BATCH_SIZE, progress=None):
+    """
+    Import every card in a deck file into store, skipping cards already in their deck.
+    deck: deck for cards whose file doesn't name one
+    progress: optional function called after each batch with
+    (fraction of the file read, cards added, duplicates skipped)
+    Returns (cards added, duplicates skipped).
+    """
+    position = _Progress()
+    if Path(path).suffix.lower() == ".apkg":
+        rows = _read_apkg(path, deck, position)
+    else:
+        rows = _read_text(path, deck, position)
+
+    added = skipped = 0
+    batch = []
+    def save():
+        nonlocal added, skipped
+        count = store.add_cards(batch)
+        added += count
+        skipped += len(batch) - count
+        batch.clear()
+        if progress:
+            progress(position.fraction(), added, skipped)
+
+    for card in rows:
+        batch.append(card)
+        if len(batch) >= batch_size:
+            save()
+    save()
+    return added, skipped
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Import a flashcard deck into the Smart Alarm database")
+    parser.add_argument("path", help="CSV, TSV, Anki text export (.txt) or Anki package (.apkg)")
+    parser.add_argument("--deck", default=flashcard_store.DEFAULT_DECK,
+                        help="deck for cards the file doesn't give one (default: %(default)s)")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    args = parser.parse_args(argv)
+
+    store = flashcard_store.FlashcardStore()
+    def show(fraction, added, skipped):
+        print(f"\r{fraction:.0%} {added} added, {skipped} already saved", end="", flush=True)
+    added, skipped = import_cards(store, args.path, args.deck, args.batch_size, show)
+    print(f"\rImported {added} cards, skipped {skipped} already saved")
+    store.close()
+
+if __name__ == "__main__":
+    main()
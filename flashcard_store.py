@@ -0,0 +1,165 @@
+"""
+Saves flashcards to the local SQLite database so decks survive a restart
+"""
+import sqlite3
+import threading
+import time
+import alarm_store # Imports the alarm_store module (for the shared database file)
+import card_collection # Imports the card_collection module
+
+# Deck used when a card isn't given one
+DEFAULT_DECK = "Default"
+
+class FlashcardStore:
+    """
+    Persistent storage for flashcards, in the same database file as the alarms.
+    Cards are indexed by deck and due time. Only ids are listed up front,
+    a card's question and answer are read when it is asked, so opening the
+    store costs the same whatever the size of the decks.
+    """
+    def __init__(self, path=alarm_store.DB_PATH):
+        # Cards are read from the GUI thread and written by importers
+        self.lock = threading.Lock()
+        self.connection = sqlite3.connect(str(path), check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("""
+            CREATE TABLE IF NOT EXISTS cards (
+                id INTEGER PRIMARY KEY,
+                deck TEXT NOT NULL DEFAULT 'Default',
+                question TEXT NOT NULL,
+                answer TEXT NOT NULL,
+                due REAL NOT NULL DEFAULT 0,
+                created REAL NOT NULL,
+                repetitions INTEGER NOT NULL DEFAULT 0,
+                interval_days REAL NOT NULL DEFAULT 0,
+                ease REAL NOT NULL DEFAULT 2.5
+            )
+        """)
+        # Databases saved before spaced repetition existed lack the scheduling columns
+        columns = [row[1] for row in self.connection.execute("PRAGMA table_info(cards)")]
+        for column, definition in (("repetitions", "INTEGER NOT NULL DEFAULT 0"),
+                                   ("interval_days", "REAL NOT NULL DEFAULT 0"),
+                                   ("ease", "REAL NOT NULL DEFAULT 2.5")):
+            if column not in columns:
+                self.connection.execute(f"ALTER TABLE cards ADD COLUMN {column} {definition}")
+        self.connection.execute("CREATE INDEX IF NOT EXISTS cards_deck_due ON cards (deck, due)")
+        self.connection.execute("CREATE INDEX IF NOT EXISTS cards_due ON cards (due)")
+        # Lets imports skip cards that are already in the deck
+        self.connection.execute("CREATE INDEX IF NOT EXISTS cards_deck_question ON cards (deck, question)")
+        # Every answer given, for the learner's history
+        self.connection.execute("""
+            CREATE TABLE IF NOT EXISTS reviews (
+                id INTEGER PRIMARY KEY,
+                card_id INTEGER NOT NULL,
+                answered_at REAL NOT NULL,
+                correct INTEGER NOT NULL,
+                quality INTEGER
+            )
+        """)
+        self.connection.execute("CREATE INDEX IF NOT EXISTS reviews_card ON reviews (card_id)")
+        self.connection.commit()
+        self._collection = None # Every card id, loaded by cards() on first use
+
+    def add_card(self, question, answer, deck=DEFAULT_DECK):
+        """Save a card in its own single-row transaction and return its id"""
+        with self.lock, self.connection:
+            cursor = self.connection.execute(
+                "INSERT INTO cards (deck, question, answer, created) VALUES (?, ?, ?, ?)",
+                (deck, question, answer, time.time())
+            )
+            if self._collection is not None:
+                self._collection.add(cursor.lastrowid)
+        return cursor.lastrowid
+
+    def add_cards(self, cards):
+        """
+        Save many (deck, question, answer) cards in one transaction, skipping any
+        whose question is already in its deck (or earlier in cards).
+        Returns how many were added.
+        """
+        now = time.time()
+        with self.lock, self.connection:
+            last_id = self.connection.execute("SELECT COALESCE(MAX(id), 0) FROM cards").fetchone()[0]
+            before = self.connection.total_changes
+            self.connection.executemany(
+                """INSERT INTO cards (deck, question, answer, created)
+                   SELECT ?1, ?2, ?3, ?4 WHERE NOT EXISTS (SELECT 1 FROM cards WHERE deck = ?1 AND question = ?2)""",
+                ((deck, question, answer, now) for deck, question, answer in cards)
+            )
+            added = self.connection.total_changes - before
+            if added and self._collection is not None:
+                for (card_id,) in self.connection.execute("SELECT id FROM cards WHERE id > ?", (last_id,)):
+                    self._collection.add(card_id)
+        return added
+
+    def remove_card(self, card_id):
+        """Delete a card and its answer history by its id"""
+        with self.lock, self.connection:
+            self.connection.execute("DELETE FROM cards WHERE id = ?", (card_id,))
+            self.connection.execute("DELETE FROM reviews WHERE card_id = ?", (card_id,))
+            if self._collection is not None:
+                self._collection.discard(card_id)
+
+    def get_card(self, card_id):
+        """Get one card as a dictionary, or None if it was deleted"""
+        with self.lock:
+            cursor = self.connection.execute(
+                "SELECT id, deck, question, answer, due, repetitions, interval_days, ease FROM cards WHERE id = ?",
+                (card_id,))
+            row = cursor.fetchone()
+            if row is None:
+                return None
+            return dict(zip([column[0] for column in cursor.description], row))
+
+    def cards(self):
+        """
+        Get every card id as a card_collection.CardCollection for O(1) random picks.
+        It is loaded once and then kept up to date as cards are added and removed.
+        """
+        with self.lock:
+            if self._collection is None:
+                self._collection = card_collection.CardCollection(
+                    row[0] for row in self.connection.execute("SELECT id FROM cards"))
+            return self._collection
+
+    def cards_page(self, after_id=0, limit=200):
+        """Get (id, question, answer) for up to limit cards with ids above after_id, in id order"""
+        with self.lock:
+            return self.connection.execute(
+                "SELECT id, question, answer FROM cards WHERE id > ? ORDER BY id LIMIT ?", (after_id, limit)).fetchall()
+
+    def count(self, deck=None):
+        with self.lock:
+            if deck is None:
+                return self.connection.execute("SELECT COUNT(*) FROM cards").fetchone()[0]
+            return self.connection.execute("SELECT COUNT(*) FROM cards WHERE deck = ?", (deck,)).fetchone()[0]
+
+    def due_times(self, after_id=0, deck=None):
+        """Get (card id, due) for every card with an id above after_id, to build a review queue"""
+        with self.lock:
+            if deck is None:
+                rows = self.connection.execute("SELECT id, due FROM cards WHERE id > ? ORDER BY id", (after_id,))
+            else:
+                rows = self.connection.execute(
+                    "SELECT id, due FROM cards WHERE id > ? AND deck = ? ORDER BY id", (after_id, deck))
+            return rows.fetchall()
+
+    def record_review(self, card_id, correct, quality=None, schedule=None):
+        """
+        Save one answer to a card, and its new schedule if given, in one transaction.
+        schedule: dictionary with due, repetitions, interval_days and ease
+        """
+        with self.lock, self.connection:
+            self.connection.execute(
+                "INSERT INTO reviews (card_id, answered_at, correct, quality) VALUES (?, ?, ?, ?)",
+                (card_id, time.time(), int(correct), quality)
+            )
+            if schedule:
+                self.connection.execute(
+                    "UPDATE cards SET due = ?, repetitions = ?, interval_days = ?, ease = ? WHERE id = ?",
+                    (schedule['due'], schedule['repetitions'], schedule['interval_days'], schedule['ease'], card_id)
+                )
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
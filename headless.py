@@ -0,0 +1,146 @@
+"""
+Smart Alarm - Headless Mode
+Runs the saved alarms with a terminal math quiz and never imports PyQt,
+for always-on machines without a display.
+Run with 'python main.py --headless' or 'python -m alarm'
+"""
+import argparse
+import random
+import sys
+import threading
+import time
+import alarm # Imports the alarm module
+import alarm_store # Imports the alarm_store module
+import math_quiz as mq # Imports math_quiz module (as mq)
+import question_pool # Imports the question_pool module
+
+# Only one quiz can use the terminal at a time
+terminal_lock = threading.Lock()
+
+def display_time(alarm_time):
+    """Format an HH:MM(:SS) 24-hour time as a 12-hour display string"""
+    hour, minute, second = alarm.parse_alarm_time(alarm_time)
+    period = "AM" if hour < 12 else "PM"
+    hour = hour % 12 or 12
+    if second is None:
+        return f"{hour:02d}:{minute:02d} {period}"
+    return f"{hour:02d}:{minute:02d}:{second:02d} {period}"
+
+def ask_in_terminal(generator):
+    """Ask math questions in the terminal until one is answered correctly"""
+    with terminal_lock:
+        print("\n*** ALARM ***")
+        print(f"(questions from seed {generator.seed}, replay with 'python math_quiz.py {generator.seed}')")
+        try:
+            while not generator.ask_question():
+                pass
+        except EOFError:
+            # Nobody can answer once input is closed, stop rather than ring forever
+            print("\nInput closed, stopping the alarm.")
+        return True
+
+def schedule_saved_alarm(store, saved):
+    """Start a saved alarm, deleting one-off alarms once they are dismissed"""
+    generator = None # Built the first time the alarm is prepared, so starting with many alarms stays fast
+    # Alarms saved before seeds existed get a new one each start
+    seed = saved['seed'] if saved['seed'] is not None else random.getrandbits(32)
+
+    def prepare(deadline):
+        # Each ring gets its own question stream, generated ahead once the ring is close
+        nonlocal generator
+        ring_seed = mq.ring_seed(seed, deadline)
+        if generator is None:
+            generator = mq.MathQuestionGenerator(difficulty=saved['difficulty'], pool=question_pool.pool,
+                                                 seed=ring_seed)
+        generator.use_seed(ring_seed)
+        question_pool.pool.prefill(generator)
+
+    def on_alarm():
+        # Every answer mode is asked as a multiple choice math question here
+        solved = ask_in_terminal(generator)
+        report_stats()
+        if solved and saved['repeat_rule'] == "Once":
+            store.remove_alarm(saved['id'])
+        return solved
+
+    return alarm.start_alarm(saved['alarm_time'], on_alarm_trigger=on_alarm,
+                             volume=saved['volume'], sound_file=saved['sound_file'],
+                             repeat=saved['repeat_rule'], prepare=prepare, saved=True)
+
+def report_stats():
+    """Print how late alarms fired this run (against alarm.JITTER_TARGET) and how the question pool did"""
+    stats = alarm.scheduler.jitter_stats()
+    if stats['count']:
+        print(f"{stats['count']} alarms fired, p50 {stats['p50_ms']:.1f} ms, p99 {stats['p99_ms']:.1f} ms, "
+              f"max {stats['max_ms']:.1f} ms late (target {alarm.JITTER_TARGET * 1000:.0f} ms)")
+    stats = question_pool.pool.stats()
+    if stats['hit_rate'] is not None:
+        refills = f"{stats['refills']} refills"
+        if stats['refills']:
+            refills += f", mean {stats['refill_mean_ms']:.1f} ms, max {stats['refill_max_ms']:.1f} ms"
+        print(f"Question pool: {stats['hits']} hits, {stats['misses']} misses "
+              f"({stats['hit_rate']:.0%} hit rate), {refills}")
+
+def main(argv=None, started_at=None):
+    """
+    Run the headless alarm daemon.
+    started_at: time.perf_counter() value at process start, for the cold-start report
+    """
+    started_at = started_at or time.perf_counter()
+    parser = argparse.ArgumentParser(description="Run Smart Alarm in the terminal without the GUI")
+    parser.add_argument("--headless", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--alarm", action="append", default=[], metavar="HH:MM",
+                        help="save a new alarm (HH:MM or HH:MM:SS), can be given more than once")
+    parser.add_argument("--repeat", default="Once",
+                        help="repeat rule for new alarms: Once, Daily, Weekdays, Weekends or a cron rule")
+    parser.add_argument("--difficulty", default="Easy", choices=mq.DIFFICULTY_NAMES,
+                        help="question difficulty for new alarms")
+    parser.add_argument("--volume", type=int, default=50, help="alarm volume for new alarms (0-100)")
+    parser.add_argument("--sound-file", help="custom sound file for new alarms")
+    parser.add_argument("--list", action="store_true", help="list saved alarms and exit")
+    args = parser.parse_args(argv)
+
+    store = alarm_store.AlarmStore()
+
+    # Save any new alarms (shared with the GUI)
+    for alarm_time in args.alarm:
+        try:
+            alarm.check_alarm(alarm_time, args.repeat)
+        except ValueError as e:
+            parser.error(f"invalid alarm {alarm_time} ({args.repeat}): {e}")
+        store.add_alarm(alarm_time, display_time(alarm_time), args.difficulty,
+                        "Multiple Choice", args.volume, args.sound_file, args.repeat,
+                        random.getrandbits(32))
+
+    saved_alarms = store.load_alarms()
+    if args.list:
+        for saved in saved_alarms:
+            print(f"{saved['alarm_time_display']} ({saved['repeat_rule']}, {saved['difficulty']})")
+        return
+
+    # Alarms are dismissed by answering in the terminal (not under systemd or nohup)
+    if not sys.stdin.isatty():
+        parser.error("headless mode needs a terminal to answer alarm questions")
+
+    scheduled = 0
+    with alarm.adding_many():
+        for saved in saved_alarms:
+            # Skip bad rows rather than failing every start
+            try:
+                schedule_saved_alarm(store, saved)
+                scheduled += 1
+            except ValueError as e:
+                print(f"Skipping saved alarm {saved['alarm_time']} ({saved['repeat_rule']}): {e}")
+    print(f"Headless started in {(time.perf_counter() - started_at) * 1000:.0f} ms")
+    print(f"Smart Alarm running headless with {scheduled} alarms. Press Ctrl+C to quit.")
+
+    # The alarms run on the scheduler thread; keep the process alive
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        print("\nSmart Alarm stopped.")
+        report_stats()
+
+if __name__ == "__main__":
+    main()
@@ -1,22 +1,68 @@
 """
 Smart Alarm - Main Entry Point
 Run this file to start the application
+Run 'python main.py --headless' to run alarms in the terminal without PyQt
 Requires 'pip install PyQt6'
-Requires 'pip install pygame' (for beeps)
+Optional 'pip install pygame' (for custom sounds, started only when an alarm rings)
+Optional 'pip install qasync' (runs alarms as coroutines on the Qt event loop)
 """
 import sys
-from PyQt6.QtWidgets import QApplication
-from PyQt6.QtCore import Qt
+import time
 
-QApplication.setHighDpiScaleFactorRoundingPolicy(Qt.HighDpiScaleFactorRoundingPolicy.PassThrough)
+# Measure cold-start time from here
+STARTED_AT = time.perf_counter()
 
-from GUI import MainWindow # Import the GUI module
 
+def run_gui():
+    """Start the PyQt GUI"""
+    # PyQt and asyncio are only imported here so headless mode never loads them
+    import asyncio
+    from PyQt6.QtWidgets import QApplication
+    from PyQt6.QtCore import Qt, QTimer
+
+    # Try to import qasync to share one asyncio loop with Qt, fallback to alarm threads
+    try:
+        import qasync
+        QASYNC_AVAILABLE = True
+    except ImportError:
+        QASYNC_AVAILABLE = False
+
+    QApplication.setHighDpiScaleFactorRoundingPolicy(Qt.HighDpiScaleFactorRoundingPolicy.PassThrough)
+
+    from GUI import MainWindow # Import the GUI module
 
-if __name__ == "__main__":
-    # Start the application
     print("Starting Smart Alarm...")
     app = QApplication(sys.argv)
-    window = MainWindow()
-    window.show()
-    sys.exit(app.exec())
\ No newline at end of file
+
+    if QASYNC_AVAILABLE:
+        # Alarms, sounds and question dialogs all run on this one loop
+        loop = qasync.QEventLoop(app)
+        asyncio.set_event_loop(loop)
+        app_closed = asyncio.Event()
+        app.aboutToQuit.connect(app_closed.set)
+
+        window = MainWindow()
+        window.show()
+        report_gui_start(QTimer)
+        with loop:
+            loop.run_until_complete(app_closed.wait())
+    else:
+        window = MainWindow()
+        window.show()
+        report_gui_start(QTimer)
+        sys.exit(app.exec())
+
+
+def report_gui_start(QTimer):
+    """Print the cold-start time once the event loop has shown the window"""
+    QTimer.singleShot(0, lambda: print(
+        f"GUI started in {(time.perf_counter() - STARTED_AT) * 1000:.0f} ms"))
+
+
+if __name__ == "__main__":
+    # Start the application
+    if "--headless" in sys.argv[1:]:
+        import headless
+        headless.main(sys.argv[1:], started_at=STARTED_AT)
+    else:
+        run_gui()
@@ -1,111 +1,516 @@
+import ast
+import functools
+import operator
 import random
+import sys
+import threading
+from array import array
+import recent_filter # Imports the recent_filter module
 
-class MathQuestionGenerator:
+# Operand ranges and operators for each difficulty: ((a low, a high), (b low, b high), operators)
+DIFFICULTIES = {
+    "Easy": ((1, 10), (1, 10), "+-"),
+    "Medium": ((5, 20), (1, 12), "+-*"),
+}
+
+# Expression tree difficulties: (fewest operands, most operands, (leaf low, leaf high), operators)
+TREE_DIFFICULTIES = {
+    "Hard": (3, 3, (2, 15), "+-*/"),
+    "Expert": (4, 5, (2, 25), "+-*/"),
+}
+
+# Every difficulty, easiest first
+DIFFICULTY_NAMES = [*DIFFICULTIES, *TREE_DIFFICULTIES]
+
+# Operators a question can use, QuestionBatch.ops stores indexes into this
+OPERATORS = "+-*/"
+
+# What each operator computes; division is integer division
+OPERATOR_FUNCTIONS = {
+    '+': operator.add,
+    '-': operator.sub,
+    '*': operator.mul,
+    '/': operator.floordiv,
+}
+
+# How tightly each operator binds, numbers bind tightest
+PRECEDENCE = {'+': 1, '-': 1, '*': 2, '/': 2}
+NUMBER_PRECEDENCE = 3
+
+# Difficulty score added by each operator, and by each pair of parentheses
+OPERATOR_SCORES = {'+': 1.0, '-': 1.5, '*': 2.0, '/': 2.5}
+PARENTHESES_SCORE = 1.0
+
+# Expression trees keep every step's value within this size
+MAX_TREE_VALUE = 999
+
+# AST node types the evaluator accepts, mapped to OPERATORS
+AST_OPERATORS = {ast.Add: '+', ast.Sub: '-', ast.Mult: '*', ast.Div: '/', ast.FloorDiv: '/'}
+
+# Written out digit by digit (up to 4 digits), a generator over the places is twice as slow
+def no_carry_sum(a, b):
+    """a + b with every carry forgotten, e.g. 18 + 7 = 15, for a, b >= 0 (works on NumPy arrays too)"""
+    return ((a % 10 + b % 10) % 10
+            + (a // 10 % 10 + b // 10 % 10) % 10 * 10
+            + (a // 100 % 10 + b // 100 % 10) % 10 * 100
+            + (a // 1000 % 10 + b // 1000 % 10) % 10 * 1000)
+
+def no_borrow_difference(a, b):
+    """a - b taking the smaller digit from the bigger one instead of borrowing, e.g. 23 - 8 = 25, for a, b >= 0"""
+    return (abs(a % 10 - b % 10)
+            + abs(a // 10 % 10 - b // 10 % 10) * 10
+            + abs(a // 100 % 10 - b // 100 % 10) * 100
+            + abs(a // 1000 % 10 - b // 1000 % 10) * 1000)
+
+# Mistakes people make for each operator, as f(a, b, answer) -> tuple of wrong answers
+# (one call per question rather than one per mistake, distractors runs for every question).
+# Written with plain arithmetic so they work on ints and NumPy arrays alike.
+ERROR_MODELS = {
+    '+': lambda a, b, answer: (
+        answer + 1, # Off by one
+        answer - 1,
+        answer + 10, # Carried twice
+        a - b, # Wrong operator
+    ),
+    '-': lambda a, b, answer: (
+        answer + 1,
+        answer - 1,
+        answer - 10, # Borrowed twice
+        b - a, # Sign flip
+        a + b, # Wrong operator
+    ),
+    '*': lambda a, b, answer: (
+        answer + 1,
+        answer - 1,
+        answer + a, # One row off in the times table
+        answer - a,
+        answer + b,
+        answer + 10, # Carry mistake
+        a + b, # Wrong operator
+    ),
+    '/': lambda a, b, answer: (
+        answer + 1,
+        answer - 1,
+        answer + 2,
+        a - b, # Wrong operator
+    ),
+}
+
+# Digit by digit mistakes, as f(a, b) -> wrong answer. Only made when both operands
+# are whole numbers: on a negative operand they give nonsense like 2 - (3 - 6) = 9995
+DIGIT_ERROR_MODELS = {
+    '+': no_carry_sum, # Forgot to carry
+    '-': no_borrow_difference, # Forgot to borrow
+}
+
+# Nearby wrong answers used when the error models don't give enough unique ones
+NEARBY_OFFSETS = [*range(-10, 0), *range(1, 11)]
+
+def draw(rng, population, count):
     """
-    Generates simple random math questions with multiple difficulty levels
+    Draw count items from the list population without replacement, using
+    exactly min(count, len(population)) rng.random() calls (a partial
+    Fisher-Yates shuffle, cheaper than rng.sample for a few items).
+    Reorders population in place.
     """
+    random_draw = rng.random
+    size = len(population)
+    for i in range(count if count < size else size):
+        j = i + int(random_draw() * (size - i))
+        population[i], population[j] = population[j], population[i]
+    return population[:count]
 
-    def __init__(self, difficulty="Easy"):
-        self.difficulty = difficulty
-        self.operations = ['+', '-', '*', '/']
+def distractors(a, b, op, answer, count=3, rng=random, extra=()):
+    """
+    Pick count unique wrong answers for a op b.
+    Drawn without replacement from ERROR_MODELS, DIGIT_ERROR_MODELS when
+    a and b are not negative, and any extra mistakes given first, then
+    from nearby numbers. Every call evaluates the
+    operator's models once and makes at most 2 * count random draws,
+    whatever the answer is.
+    """
+    candidates = set(ERROR_MODELS[op](a, b, answer))
+    # Subtrees of expression questions can be negative
+    if a >= 0 and b >= 0 and op in DIGIT_ERROR_MODELS:
+        candidates.add(DIGIT_ERROR_MODELS[op](a, b))
+    if extra:
+        candidates.update(extra)
+    candidates.discard(answer)
+    wrong = draw(rng, list(candidates), count) # Set order of ints is the same every run
+    if len(wrong) < count:
+        # Each wrong answer so far can collide with at most one offset, so count offsets are enough
+        for offset in draw(rng, NEARBY_OFFSETS.copy(), count):
+            if answer + offset not in wrong:
+                wrong.append(answer + offset)
+                if len(wrong) == count:
+                    break
+    return wrong
 
-    @staticmethod
-    def calculate_answer(a, b, op):
-        if op == '+':
-            return a + b
-        elif op == '-':
-            return a - b
-        elif op == '*':
-            return a * b
-        elif op == '/':
-            return a // b  # integer division
+# Batches smaller than this are built in plain Python, NumPy only pays off for larger ones
+VECTORIZE_MIN = 64
+
+def _compile_node(node):
+    """Turn an expression AST node into a function computing its value"""
+    if isinstance(node, ast.Constant) and type(node.value) is int:
+        value = node.value
+        return lambda: value
+    if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.USub):
+        operand = _compile_node(node.operand)
+        return lambda: -operand()
+    if isinstance(node, ast.BinOp) and type(node.op) in AST_OPERATORS:
+        function = OPERATOR_FUNCTIONS[AST_OPERATORS[type(node.op)]]
+        left, right = _compile_node(node.left), _compile_node(node.right)
+        return lambda: function(left(), right())
+    raise ValueError(f"Unsupported expression: {ast.dump(node)}")
+
+@functools.lru_cache(maxsize=1024)
+def compile_expression(expression):
+    """
+    Compile an arithmetic question like "12 * 3 - 4" into a function returning its answer.
+    Only whole numbers and + - * / are allowed, so questions loaded from
+    files are never run as code. Raises ValueError for anything else.
+    """
+    try:
+        # eval allowed surrounding whitespace, which ast.parse rejects at the start
+        return _compile_node(ast.parse(expression.strip(), mode="eval").body)
+    except SyntaxError as e:
+        raise ValueError(f"Invalid expression: {expression}") from e
+    except (RecursionError, MemoryError) as e: # The parser runs out of stack on deeply nested input
+        raise ValueError(f"Expression nested too deeply: {expression[:50]}") from e
+
+def evaluate(expression):
+    """
+    Safely work out the answer to an arithmetic question string (replaces eval).
+    Raises ValueError for anything that isn't a valid question, including division by zero.
+    """
+    try:
+        return compile_expression(expression)()
+    except ZeroDivisionError as e:
+        raise ValueError(f"Division by zero: {expression}") from e
+    except RecursionError as e:
+        raise ValueError(f"Expression nested too deeply: {expression[:50]}") from e
+
+# Expression trees are nested tuples: (value,) for a number and
+# (value, op, left, right) for left op right. Tuples are much cheaper
+# to build than objects, which is most of the work of a tree question;
+# the text and score are only worked out when a question is read.
+
+def format_expression(node):
+    """Get (text, difficulty score, precedence) of an expression tree"""
+    if len(node) == 1:
+        return str(node[0]), 0.0, NUMBER_PRECEDENCE
+    value, op, left, right = node
+    precedence = PRECEDENCE[op]
+    left_text, left_score, left_precedence = format_expression(left)
+    right_text, right_score, right_precedence = format_expression(right)
+    score = left_score + right_score + OPERATOR_SCORES[op] + 0.25 * len(str(abs(value)))
+    if left_precedence < precedence:
+        left_text = f"({left_text})"
+        score += PARENTHESES_SCORE
+    # a - (b - c) and a / (b * c) need brackets even at equal precedence
+    if right_precedence < precedence or (right_precedence == precedence and op in "-/"):
+        right_text = f"({right_text})"
+        score += PARENTHESES_SCORE
+    return f"{left_text} {op} {right_text}", score, precedence
+
+def left_to_right(node):
+    """Value a student gets by ignoring precedence and brackets, None if it can't be worked out"""
+    # Walk the numbers in written order, each operator is pushed between its subtrees
+    value = op = None
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        if type(node) is str:
+            op = node
+        elif len(node) == 4:
+            stack += (node[3], node[1], node[2])
+        elif value is None:
+            value = node[0]
+        else:
+            operand = node[0]
+            if op == '/' and (operand == 0 or value % operand):
+                return None
+            value = OPERATOR_FUNCTIONS[op](value, operand)
+    return value
+
+@functools.lru_cache(maxsize=4096)
+def exact_divisors(value, low):
+    """Numbers from low to 12 that divide value exactly (none for 0)"""
+    return tuple(d for d in range(low, 13) if value % d == 0) if value else ()
+
+def random_expression(rng, count, leaf_range, operators):
+    """
+    Build a random expression tree with count numbers.
+    Division always divides exactly, and every step stays within MAX_TREE_VALUE.
+    """
+    low = leaf_range[0]
+    return _random_tree(rng.random, count, low, leaf_range[1] - low + 1, operators, operators.replace('/', ''))
+
+def _random_tree(draw, count, low, span, operators, others):
+    # Draws with rng.random() rather than randint and choice, which cost several times as much
+    if count == 1:
+        return (low + int(draw() * span),)
+    op = operators[int(draw() * len(operators))]
+    if op == '/':
+        # Divide a subtree by one of the numbers that goes into it exactly
+        if count == 2:
+            left = (low + int(draw() * span),)
+        else:
+            left = _random_tree(draw, count - 1, low, span, operators, others)
+        divisors = exact_divisors(left[0], low)
+        if divisors:
+            divisor = divisors[int(draw() * len(divisors))]
+            return (left[0] // divisor, op, left, (divisor,))
+        op = others[int(draw() * len(others))]
+        right = (low + int(draw() * span),)
+    else:
+        # Numbers are built here rather than by a call each, half the nodes are numbers
+        left_count = 1 + int(draw() * (count - 1))
+        if left_count == 1:
+            left = (low + int(draw() * span),)
         else:
+            left = _random_tree(draw, left_count, low, span, operators, others)
+        if left_count == count - 1:
+            right = (low + int(draw() * span),)
+        else:
+            right = _random_tree(draw, count - left_count, low, span, operators, others)
+    a, b = left[0], right[0]
+    value = OPERATOR_FUNCTIONS[op](a, b)
+    if op == '*' and abs(value) > MAX_TREE_VALUE:
+        op = '+' # Keep products small enough to work out in your head
+        value = a + b
+    if abs(value) > MAX_TREE_VALUE:
+        op = '-'
+        value = a - b
+    return (value, op, left, right)
+
+class QuestionBatch:
+    """
+    Many generated questions stored column by column in compact arrays
+    (NumPy arrays when built by NumPy, array.array otherwise).
+    a, b: operands, ops: index into OPERATORS, answers: correct answers,
+    options: 4 shuffled answer options per question, flattened.
+    Expression tree questions have no single a, b and op, they keep their
+    expression trees instead, which are only formatted as questions are read.
+    batch[i] gives the same (question, correct_answer, options) tuple as generate_question.
+    """
+    def __init__(self, a, b, ops, answers, options, expressions=None):
+        self.a = a
+        self.b = b
+        self.ops = ops
+        self.answers = answers
+        self.options = options
+        self.expressions = expressions
+
+    @property
+    def scores(self):
+        """Difficulty score of each expression tree question, None for plain questions"""
+        if self.expressions is None:
             return None
+        return array('d', (format_expression(expression)[1] for expression in self.expressions))
 
-    def ask_question(self):
-        """Ask the user the math question and check the answer."""
-        question, correct_answer, options = self.generate_question()
-        print("Solve this to turn off the alarm!")
-        print("Question:", question)
-        
-        # Display multiple choice options
-        print("\nChoose an answer:")
-        for i, option in enumerate(options, 1):
-            print(f"{i}. {option}")
+    def __len__(self):
+        return len(self.answers)
 
-        user_answer = input("Your answer (1-4): ")
+    def __getitem__(self, i):
+        if not -len(self) <= i < len(self):
+            raise IndexError("question index out of range")
+        i %= len(self)
+        if self.expressions is not None:
+            question = format_expression(self.expressions[i])[0]
+        else:
+            question = f"{self.a[i]} {OPERATORS[self.ops[i]]} {self.b[i]}"
+        options = [int(option) for option in self.options[4 * i:4 * i + 4]]
+        return question, int(self.answers[i]), options
+
+def generate_questions(difficulty, n, rng=None):
+    """
+    Generate n random math questions with answer options as a QuestionBatch.
+    Uses one vectorized NumPy pass when NumPy is installed.
+    rng: random.Random to draw from (the shared random module by default).
+    Below VECTORIZE_MIN each question takes the same draws from rng, so a
+    seeded rng gives the same questions however they are split into batches.
+    """
+    if rng is None:
+        rng = random
+    if difficulty in TREE_DIFFICULTIES:
+        return _generate_tree_questions(TREE_DIFFICULTIES[difficulty], n, rng)
+    a_range, b_range, operators = DIFFICULTIES.get(difficulty, DIFFICULTIES["Easy"]) # Default to Easy if unknown difficulty
+    if n >= VECTORIZE_MIN:
         try:
-            choice_index = int(user_answer) - 1
-            if 0 <= choice_index < 4:
-                selected = options[choice_index]
-                if abs(selected - correct_answer) < 0.001:
-                    print("Correct! Alarm off.")
-                    return True
-                else:
-                    print(f"Wrong! The correct answer was {correct_answer}. Try again.")
-                    return False
-            else:
-                print("Please choose 1, 2, 3, or 4.")
-                return False
-        except ValueError:
-            print("Please enter a number between 1 and 4.")
-            return False
+            return _generate_questions_numpy(a_range, b_range, operators, n, rng)
+        except ImportError:
+            pass
+
+    a, b = array('l'), array('l')
+    ops, answers, options = array('B'), array('l'), array('l')
+    for _ in range(n):
+        x, y = rng.randint(*a_range), rng.randint(*b_range)
+        op = rng.choice(operators)
+        correct_answer = OPERATOR_FUNCTIONS[op](x, y)
+
+        # generate 3 wrong options
+        choices = [correct_answer] + distractors(x, y, op, correct_answer, rng=rng)
+        rng.shuffle(choices)
+
+        a.append(x)
+        b.append(y)
+        ops.append(OPERATORS.index(op))
+        answers.append(correct_answer)
+        options.extend(choices)
+    return QuestionBatch(a, b, ops, answers, options)
+
+def _generate_tree_questions(tree_difficulty, n, rng):
+    """Generate n expression tree questions, wrong options come from the mistakes at the root"""
+    fewest, most, (low, high), operators = tree_difficulty
+    # random_expression's setup, done once for the batch
+    random_draw = rng.random
+    span, others = high - low + 1, operators.replace('/', '')
+    answers, options = array('l'), array('l')
+    expressions = []
+    for _ in range(n):
+        expression = _random_tree(random_draw, fewest + int(random_draw() * (most - fewest + 1)),
+                                  low, span, operators, others)
+        answer, op, left, right = expression
+        ignored_precedence = left_to_right(expression)
+        # Every step of a real answer is within MAX_TREE_VALUE, so a bigger option is easy to rule out
+        plausible = ignored_precedence is not None and abs(ignored_precedence) <= MAX_TREE_VALUE
+        mistakes = (ignored_precedence,) if plausible else ()
+        choices = distractors(left[0], right[0], op, answer, rng=rng, extra=mistakes)
+        # The wrong answers come out in random order, so placing the answer is the whole shuffle
+        choices.insert(int(random_draw() * 4), answer)
+        expressions.append(expression)
+        answers.append(answer)
+        options.extend(choices)
+    return QuestionBatch(None, None, None, answers, options, expressions)
+
+def _generate_questions_numpy(a_range, b_range, operators, n, seed_rng):
+    import numpy as np # Optional, only imported for large batches
+    # Seeded from the caller's rng so batches are reproducible too
+    rng = np.random.default_rng(seed_rng.getrandbits(64))
+
+    a = rng.integers(a_range[0], a_range[1] + 1, n, dtype=np.int32)
+    b = rng.integers(b_range[0], b_range[1] + 1, n, dtype=np.int32)
+    codes = np.array([OPERATORS.index(op) for op in operators], dtype=np.uint8)
+    ops = codes[rng.integers(0, len(codes), n)]
+    answers = np.choose(ops, [a + b, a - b, a * b, a // b])
+
+    options = np.empty((n, 4), dtype=np.int32)
+    options[:, 0] = answers
+    for code in np.unique(ops):
+        rows = ops == code
+        options[rows, 1:] = _distractors_numpy(np, rng, a[rows], b[rows], OPERATORS[code], answers[rows])
+    # Shuffle each row so the correct answer lands in a random place
+    order = np.argsort(rng.random((n, 4)), axis=1)
+    options = np.take_along_axis(options, order, axis=1)
+
+    return QuestionBatch(a, b, ops, answers, options.reshape(-1))
+
+def _distractors_numpy(np, rng, a, b, op, answers):
+    """
+    Vectorized distractors: 3 unique wrong answers per row, preferring the
+    error models over nearby numbers, picked by random sort keys.
+    """
+    models = list(ERROR_MODELS[op](a, b, answers))
+    if op in DIGIT_ERROR_MODELS: # DIFFICULTIES operands are never negative
+        models.append(DIGIT_ERROR_MODELS[op](a, b))
+    candidates = np.stack(models + [answers + offset for offset in NEARBY_OFFSETS], axis=1)
+    keys = rng.random(candidates.shape)
+    keys[:, len(models):] += 1 # Nearby numbers only when the models run out
 
-def generate_question(difficulty):
+    # Rule out the answer itself and repeats of an earlier candidate
+    keys[candidates == answers[:, None]] = np.inf
+    order = np.argsort(candidates, axis=1, kind="stable")
+    ordered = np.take_along_axis(candidates, order, axis=1)
+    repeated = np.zeros(candidates.shape, dtype=bool)
+    repeated[:, 1:] = ordered[:, 1:] == ordered[:, :-1]
+    keys[np.arange(len(a))[:, None], order] = np.where(
+        repeated, np.inf, np.take_along_axis(keys, order, axis=1))
+
+    picks = np.argpartition(keys, 2, axis=1)[:, :3]
+    return np.take_along_axis(candidates, picks, axis=1)
+
+def generate_question(difficulty, rng=None):
     """Generate a random math question and a few answer options."""
-    if difficulty == "Easy":
-        a, b = random.randint(1, 10), random.randint(1, 10)
-        op = random.choice(["+", "-"])
-    elif difficulty == "Medium":
-        a, b = random.randint(5, 20), random.randint(1, 12)
-        op = random.choice(["+", "-", "*"])
-    else: # Default to Easy if unkown difficulty
-        a, b = random.randint(1, 10), random.randint(1, 10)
-        op = random.choice(["+", "-"])
-
-    question = f"{a} {op} {b}"
-    correct_answer = int(eval(question))
-
-    # generate 3 wrong options
-    options = [correct_answer]
-    while len(options) < 4:
-        wrong = correct_answer + random.randint(-10, 10)
-        if wrong != correct_answer and wrong not in options:
-            options.append(wrong)
-    random.shuffle(options)
-
-    return question, correct_answer, options
+    return generate_questions(difficulty, 1, rng)[0]
+
+def ring_seed(alarm_seed, deadline):
+    """
+    Seed for the questions asked by one ring of an alarm, from the alarm's
+    saved seed and the deadline (seconds since the epoch) it rings at.
+    Every ring gets a new stream, even across restarts, and the seed it
+    prints can still be replayed with MathQuestionGenerator(seed=...).
+    """
+    return random.Random(f"{alarm_seed}:{deadline:.0f}").getrandbits(32)
 
 class MathQuestionGenerator:
     """
     Generates simple random math questions with multiple difficulty levels
     """
 
-    def __init__(self, difficulty="Easy"):
+    def __init__(self, difficulty="Easy", pool=None, seed=None, bank=None):
+        # Other banks have no answer options to show
+        if bank is not None and bank.kind != "math":
+            raise ValueError(f"Not a math question bank ({bank.kind}): {bank.path}")
         self.difficulty = difficulty
         self.operations = ['+', '-', '*', '/']
+        self.pool = pool # Optional question_pool.QuestionPool to take ready questions from
+        self.bank = bank # Optional question_bank.QuestionBank to draw questions from instead
+        # Each generator has its own random stream, so the questions it asked
+        # can be replayed with MathQuestionGenerator(difficulty, seed=seed)
+        self.seed = seed if seed is not None else random.getrandbits(32)
+        self._rng = None # Seeded on first use, seeding costs more than the rest of the generator
+        self.lock = threading.RLock() # Only guards this generator's stream
+        # Questions asked recently are skipped (a few draws at most)
+        self.recent = recent_filter.RecentFilter(mode=f"math:{difficulty}")
+
+    @property
+    def rng(self):
+        if self._rng is None:
+            self._rng = random.Random(self.seed)
+        return self._rng
+
+    def use_seed(self, seed):
+        """Switch to the question stream for seed, e.g. for the next ring of an alarm (no-op if already on it)"""
+        with self.lock:
+            if seed == self.seed:
+                return
+            self.seed = seed
+            self._rng = None
+            # Start the new stream with no history, as a fresh generator replaying this seed would
+            self.recent = recent_filter.RecentFilter(self.recent.window, mode=f"math:{self.difficulty}")
+            if self.pool:
+                self.pool.clear(self) # Questions waiting in the pool are from the old stream
 
     def generate_question(self):
         """Generate a random math question and a few answer options."""
-        # Use the standalone function to avoid code duplication
-        return generate_question(self.difficulty)
+        return self.recent.pick(self._next_question, key=lambda question: question[0])
+
+    def _next_question(self):
+        if self.pool:
+            return self.pool.pop(self)
+        return self.generate_questions(1)[0]
+
+    def generate_questions(self, count):
+        """Generate the next count questions from this generator's stream"""
+        with self.lock:
+            if self.bank:
+                return self.bank.questions(count, self.rng)
+            # Use the standalone function to avoid code duplication
+            return generate_questions(self.difficulty, count, self.rng)
 
     def set_difficulty(self, difficulty):
         """Update the difficulty level"""
+        if difficulty != self.difficulty and self.pool:
+            self.pool.clear(self) # Questions waiting in the pool are for the old difficulty
+        if difficulty != self.difficulty:
+            self.recent = recent_filter.RecentFilter(self.recent.window, mode=f"math:{difficulty}")
         self.difficulty = difficulty
 
     @staticmethod
     def calculate_answer(a, b, op):
-        if op == '+':
-            return a + b
-        elif op == '-':
-            return a - b
-        elif op == '*':
-            return a * b
-        elif op == '/':
-            return a // b  # integer division
-        else:
-            return None
+        function = OPERATOR_FUNCTIONS.get(op)
+        return function(a, b) if function else None
 
     def ask_question(self):
         """Ask the user the math question and check the answer."""
@@ -179,11 +584,14 @@ class MathQuestionGenerator:
 # Example usage
 if __name__ == "__main__":
     print("Math Quiz Alarm!")
-    difficulty = input("Choose difficulty (Easy/ Medium): ").strip().title()
-    if difficulty not in ["Easy", "Medium"]:
+    # Pass a seed to replay the questions an alarm asked
+    seed = int(sys.argv[1]) if len(sys.argv) > 1 else None
+    difficulty = input(f"Choose difficulty ({'/ '.join(DIFFICULTY_NAMES)}): ").strip().title()
+    if difficulty not in DIFFICULTY_NAMES:
         difficulty = "Easy"
 
-    generator = MathQuestionGenerator(difficulty=difficulty)
+    generator = MathQuestionGenerator(difficulty=difficulty, seed=seed)
+    print(f"Question seed: {generator.seed}")
     
     # Keep asking until the user gets it correct
     while not generator.ask_question():
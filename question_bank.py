@@ -0,0 +1,171 @@
+"""
+Binary question banks: large sets of curated questions (arithmetic facts,
+vocabulary) kept in one file that is memory-mapped instead of loaded.
+
+File layout, all little-endian:
+    header   HEADER: magic b"SAQB", format version, kind (0 math, 1 vocab),
+             entry count, string table offset and size, records offset,
+             label offset and length (in the string table)
+    strings  UTF-8 text of every question, answer and the label, repeats stored once
+    records  RECORD per entry: question offset and length, answer offset
+             and length, and 3 wrong answers (math banks only)
+Records are fixed width, so entry i is read in O(1) without loading the rest.
+
+Build a bank with 'python question_bank.py build-math bank.saqb --difficulty Easy --count 1000000'
+and show one with 'python question_bank.py info bank.saqb'.
+"""
+import argparse
+import mmap
+import os
+import random
+import struct
+from collections import namedtuple
+from pathlib import Path
+
+MAGIC = b"SAQB"
+VERSION = 1
+KINDS = {"math": 0, "vocab": 1}
+
+# magic, version, kind, count, strings offset, strings size, records offset, label offset, label length
+HEADER = struct.Struct("<4sHHQQQQII")
+# question offset, question length, answer offset, answer length, 3 wrong answers
+RECORD = struct.Struct("<IIIIiii")
+
+Entry = namedtuple("Entry", ["question", "answer", "wrong_answers"])
+
+class QuestionBank:
+    """
+    Read-only view of a bank file.
+    Opening only reads the header, entries are decoded as they are used, so
+    memory use stays flat whatever the size of the bank.
+    """
+    def __init__(self, path):
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._map) < HEADER.size:
+            raise ValueError(f"Not a question bank: {self.path}")
+        (magic, version, kind, self.count, self._strings_offset, self._strings_size,
+         self._records_offset, label_offset, label_length) = HEADER.unpack_from(self._map)
+        if magic != MAGIC:
+            raise ValueError(f"Not a question bank: {self.path}")
+        if version != VERSION:
+            raise ValueError(f"Unsupported question bank version {version}: {self.path}")
+        if self._records_offset + self.count * RECORD.size > len(self._map):
+            raise ValueError(f"Question bank is truncated: {self.path}")
+        self.kind = {value: name for name, value in KINDS.items()}.get(kind, "unknown")
+        self.label = self._string(label_offset, label_length)
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, i):
+        if not -self.count <= i < self.count:
+            raise IndexError("question bank index out of range")
+        i %= self.count
+        (question_offset, question_length, answer_offset, answer_length,
+         *wrong_answers) = RECORD.unpack_from(self._map, self._records_offset + i * RECORD.size)
+        return Entry(self._string(question_offset, question_length),
+                     self._string(answer_offset, answer_length),
+                     wrong_answers if self.kind == "math" else None)
+
+    def _string(self, offset, length):
+        start = self._strings_offset + offset
+        return self._map[start:start + length].decode("utf-8")
+
+    def question(self, i, rng=random):
+        """
+        Get entry i as a (question, correct_answer, options) tuple like
+        math_quiz.generate_question. Options are None for vocab banks.
+        """
+        question, answer, wrong_answers = self[i]
+        if wrong_answers is None:
+            return question, answer, None
+        answer = int(answer)
+        options = [answer, *wrong_answers]
+        rng.shuffle(options)
+        return question, answer, options
+
+    def questions(self, count, rng=random):
+        """Draw count random entries as question tuples"""
+        return [self.question(rng.randrange(self.count), rng) for _ in range(count)]
+
+    def close(self):
+        self._map.close()
+
+def write_bank(path, entries, kind="math", label=""):
+    """
+    Write a bank file from an iterable of (question, answer, wrong answers) tuples.
+    Wrong answers are 3 ints for math banks and None for vocab banks.
+    Entries are streamed, only the records and the repeated-string index are kept in memory.
+    Returns the number of entries written.
+    """
+    path = Path(path)
+    strings = {} # text -> offset, so repeated answers are stored once
+    strings_size = 0
+    records = bytearray()
+    temp = path.with_suffix(path.suffix + ".tmp")
+
+    with open(temp, "wb") as f:
+        f.write(bytes(HEADER.size)) # Filled in once the sizes are known
+
+        def add_string(text):
+            nonlocal strings_size
+            data = text.encode("utf-8")
+            if text not in strings:
+                strings[text] = strings_size
+                f.write(data)
+                strings_size += len(data)
+            return strings[text], len(data)
+
+        label_offset, label_length = add_string(label)
+        count = 0
+        for question, answer, wrong_answers in entries:
+            records += RECORD.pack(*add_string(str(question)), *add_string(str(answer)),
+                                   *(wrong_answers or (0, 0, 0)))
+            count += 1
+
+        records_offset = HEADER.size + strings_size
+        f.write(records)
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, VERSION, KINDS[kind], count, HEADER.size, strings_size,
+                            records_offset, label_offset, label_length))
+    # Replace the old bank only once the new one is complete
+    os.replace(temp, path)
+    return count
+
+def math_entries(difficulty, count, seed=None, batch_size=10000):
+    """Generate count math questions for a bank, batch by batch"""
+    import math_quiz as mq # Imports math_quiz module (as mq)
+    rng = random.Random(seed)
+    while count > 0:
+        batch = mq.generate_questions(difficulty, min(count, batch_size), rng)
+        for question, answer, options in batch:
+            yield question, answer, [option for option in options if option != answer]
+        count -= len(batch)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build or inspect Smart Alarm question banks")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser("build-math", help="build a bank of generated math questions")
+    build.add_argument("path")
+    build.add_argument("--difficulty", default="Easy")
+    build.add_argument("--count", type=int, default=100000)
+    build.add_argument("--seed", type=int)
+    info = commands.add_parser("info", help="show a bank's details and first questions")
+    info.add_argument("path")
+    args = parser.parse_args(argv)
+
+    if args.command == "build-math":
+        count = write_bank(args.path, math_entries(args.difficulty, args.count, args.seed),
+                           kind="math", label=args.difficulty)
+        print(f"Wrote {count} questions to {args.path}")
+    else:
+        bank = QuestionBank(args.path)
+        print(f"{bank.label or bank.path.name}: {len(bank)} {bank.kind} questions, "
+              f"{bank.path.stat().st_size / 1e6:.1f} MB")
+        for i in range(min(5, len(bank))):
+            print(f"  {bank[i]}")
+
+if __name__ == "__main__":
+    main()
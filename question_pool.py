@@ -0,0 +1,129 @@
+"""
+Keeps questions generated ahead of time, so showing one when an alarm
+goes off (or after a wrong answer) never waits on the generator.
+"""
+import collections
+import threading
+import time
+import weakref
+
+# Questions kept ready for each generator
+POOL_SIZE = 32
+# Refill a difficulty once it has this many questions or fewer left
+REFILL_AT = 8
+# Questions generated per refill step, the worker yields between steps.
+# Kept under math_quiz.VECTORIZE_MIN so refills draw the same questions as a replay
+REFILL_BATCH = 8
+
+class QuestionPool:
+    """
+    Ring buffer of ready (question, answer, options) tuples for each
+    math_quiz.MathQuestionGenerator, drawn from that generator's own seeded
+    stream. pop() takes a question in O(1). A background worker tops up
+    buffers that run low, in small batches so it doesn't hold up the GUI
+    thread. If a buffer is empty the question is generated on the spot (a miss).
+    Questions always come out in stream order, so a seed replays them exactly.
+    """
+    def __init__(self, size=POOL_SIZE, refill_at=REFILL_AT):
+        self.size = size
+        self.refill_at = refill_at
+        self._buffers = weakref.WeakKeyDictionary() # generator -> deque of questions
+        self._wanted = collections.deque() # Generators waiting for a refill
+        self._condition = threading.Condition()
+        self.hits = 0
+        self.misses = 0
+        self.refill_times = collections.deque(maxlen=100) # Seconds per refill
+        self.thread = None
+
+    def pop(self, generator):
+        """Get the next question from generator, generating it now if none are ready"""
+        with self._condition:
+            buffer = self._buffer(generator)
+            if len(buffer) <= self.refill_at:
+                self._request(generator)
+            if buffer:
+                self.hits += 1
+                return buffer.popleft()
+            self.misses += 1
+
+        # Holding the generator's lock means no refill batch is half added
+        with generator.lock:
+            with self._condition:
+                if buffer:
+                    return buffer.popleft()
+            return generator.generate_questions(1)[0]
+
+    def prefill(self, generator):
+        """Start filling the buffer for generator ahead of an alarm"""
+        with self._condition:
+            if len(self._buffer(generator)) < self.size:
+                self._request(generator)
+
+    def clear(self, generator):
+        """Drop the questions waiting for generator, e.g. after its difficulty changes"""
+        with self._condition:
+            self._buffer(generator).clear()
+
+    def stats(self):
+        """Hit rate and refill latency (milliseconds) so far"""
+        with self._condition:
+            requests = self.hits + self.misses
+            refill_times = sorted(self.refill_times)
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / requests if requests else None,
+                'refills': len(refill_times),
+                'refill_mean_ms': sum(refill_times) / len(refill_times) * 1000 if refill_times else None,
+                'refill_max_ms': refill_times[-1] * 1000 if refill_times else None,
+                'ready': {f"{generator.difficulty} (seed {generator.seed})": len(buffer)
+                          for generator, buffer in self._buffers.items()},
+            }
+
+    def _buffer(self, generator):
+        if generator not in self._buffers:
+            self._buffers[generator] = collections.deque(maxlen=self.size)
+        return self._buffers[generator]
+
+    def _request(self, generator):
+        """Queue a refill for generator. Must be called with the condition held."""
+        if generator not in self._wanted:
+            self._wanted.append(generator)
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self._run, name="QuestionPool", daemon=True)
+                self.thread.start()
+            self._condition.notify()
+
+    def _refill(self, generator):
+        """Top up one buffer, a batch at a time"""
+        start = time.perf_counter()
+        while True:
+            with self._condition:
+                missing = self.size - len(self._buffer(generator))
+            if missing <= 0:
+                break
+            # Only this generator's stream is locked, other refills don't wait on it
+            with generator.lock:
+                batch = generator.generate_questions(min(missing, REFILL_BATCH))
+                with self._condition:
+                    self._buffer(generator).extend(batch)
+            time.sleep(0) # Let the GUI thread run between batches
+        with self._condition:
+            self.refill_times.append(time.perf_counter() - start)
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._wanted:
+                    self._condition.wait()
+                generator = self._wanted[0]
+            try:
+                self._refill(generator)
+            except Exception as e:
+                print(f"Question pool refill error: {e}")
+            with self._condition:
+                self._wanted.popleft()
+            del generator # Let finished generators be garbage collected
+
+# Shared pool used by the question dialog and the headless quiz
+pool = QuestionPool()
@@ -0,0 +1,82 @@
+"""
+Stops the same question or flashcard from being asked again right away
+"""
+import collections
+import threading
+
+# How many recent items are remembered
+RECENT_WINDOW = 20
+# Extra draws allowed when an item was asked recently, after that it is used anyway
+MAX_RETRIES = 5
+
+# Collision counts for each mode (e.g. "math:Easy", "flashcards"), see report()
+_stats = collections.defaultdict(collections.Counter)
+_stats_lock = threading.Lock()
+
+class RecentFilter:
+    """
+    LRU set of the last window items asked in one mode.
+    Membership checks and updates are O(1), and pick() draws a bounded
+    number of times, so a small question space can't make it loop forever.
+    """
+    def __init__(self, window=RECENT_WINDOW, mode="default"):
+        self.window = window
+        self.mode = mode
+        self._items = collections.OrderedDict()
+
+    def __contains__(self, item):
+        return item in self._items
+
+    def __len__(self):
+        return len(self._items)
+
+    def add(self, item):
+        """Remember item, forgetting the oldest once the window is full"""
+        if item in self._items:
+            self._items.move_to_end(item)
+        else:
+            self._items[item] = None
+            if len(self._items) > self.window:
+                self._items.popitem(last=False)
+
+    def pick(self, draw, key=None, retries=MAX_RETRIES):
+        """
+        Call draw() until it returns something not asked recently, then remember and return it.
+        key: function giving the hashable part of a drawn item to compare (the item itself by default)
+        After retries repeats the last draw is used even though it is recent.
+        """
+        collisions = 0
+        for _ in range(retries + 1):
+            item = draw()
+            item_key = key(item) if key else item
+            if item_key not in self._items:
+                break
+            collisions += 1
+        self.add(item_key)
+        self.record(collisions, collisions > retries)
+        return item
+
+    def record(self, collisions, repeated=False):
+        """
+        Count one pick in report(), for callers that draw without pick()
+        (e.g. spaced_repetition.CardScheduler.next_card).
+        collisions: recent items drawn and passed over, repeated: whether a recent item was asked anyway
+        """
+        with _stats_lock:
+            stats = _stats[self.mode]
+            stats['picks'] += 1
+            stats['collisions'] += collisions
+            stats['repeats'] += repeated # Gave up and asked a recent item again
+
+def report():
+    """How often recent items were drawn again, for each mode"""
+    with _stats_lock:
+        return {
+            mode: {
+                'picks': stats['picks'],
+                'collisions': stats['collisions'],
+                'collisions_per_pick': stats['collisions'] / stats['picks'],
+                'repeats': stats['repeats'],
+            }
+            for mode, stats in sorted(_stats.items()) if stats['picks']
+        }
@@ -0,0 +1,182 @@
+"""
+Spaced repetition for flashcards, using the SM-2 algorithm.
+Cards answered well come back after growing intervals, cards answered
+wrong come back within minutes. Every answer is saved to the flashcard
+store along with the card's new schedule, so it survives a restart.
+"""
+import collections
+import heapq
+import threading
+import time
+import recent_filter # Imports the recent_filter module
+
+DAY = 24 * 60 * 60
+# SM-2 answer quality, 0 (blackout) to 5 (perfect). Below PASSING_QUALITY counts as forgotten
+CORRECT_QUALITY = 4
+WRONG_QUALITY = 1
+PASSING_QUALITY = 3
+# Ease factor of a new card, and the lowest it can fall to
+STARTING_EASE = 2.5
+MIN_EASE = 1.3
+# How soon a forgotten card is asked again
+RELEARN_DELAY = 10 * 60
+
+def next_schedule(repetitions, interval_days, ease, quality, now):
+    """
+    SM-2 update for one answer of the given quality.
+    Returns the card's new schedule as a dictionary with due, repetitions, interval_days and ease.
+    """
+    ease = max(MIN_EASE, ease + 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02))
+    if quality < PASSING_QUALITY:
+        return {'due': now + RELEARN_DELAY, 'repetitions': 0, 'interval_days': 0, 'ease': ease}
+    if repetitions == 0:
+        interval_days = 1
+    elif repetitions == 1:
+        interval_days = 6
+    else:
+        interval_days = round(interval_days * ease)
+    return {'due': now + interval_days * DAY, 'repetitions': repetitions + 1,
+            'interval_days': interval_days, 'ease': ease}
+
+class CardScheduler:
+    """
+    Review queue for a flashcard_store.FlashcardStore.
+    Keeps (due, card id) for every reviewed card in a heap, so the next card is
+    found in O(log n) however big the decks get. Cards never asked (due 0) wait
+    in a separate queue in the order they were added, so reviews that are due
+    come first even in a large imported deck. Only ids and due times are held
+    in memory, a card's text is read when it is asked.
+    The queue is built by start_loading() in the background (or else on first
+    use), and cards added to the store since (by the settings panel or an
+    importer) are picked up on the next pick.
+    """
+    def __init__(self, store, deck=None, clock=time.time):
+        self.store = store
+        self.deck = deck
+        self.clock = clock
+        self.lock = threading.Lock()
+        self._heap = [] # (due, card id) of reviewed cards
+        self._new = collections.deque() # Ids of cards never asked
+        self._due = {} # card id -> current due time, queue entries that disagree are stale
+        self._last_id = 0 # Highest card id already queued
+        self._loaded = False
+
+    def __len__(self):
+        with self.lock:
+            self._sync()
+            return len(self._due)
+
+    def load(self):
+        """Build the queue now, reading every card's id and due time"""
+        with self.lock:
+            self._sync()
+
+    def start_loading(self):
+        """Build the queue on a background thread, so the first pick at alarm time doesn't read every card"""
+        threading.Thread(target=self.load, name="CardScheduler", daemon=True).start()
+
+    def _sync(self):
+        """Queue cards added to the store since the last sync"""
+        rows = self.store.due_times(self._last_id, self.deck)
+        if not rows:
+            return
+        for card_id, due in rows:
+            self._due[card_id] = due
+        self._new.extend(card_id for card_id, due in rows if not due)
+        if self._loaded:
+            for card_id, due in rows:
+                if due:
+                    heapq.heappush(self._heap, (due, card_id))
+        else:
+            # One O(n) heapify for the first load rather than n pushes
+            self._heap.extend((due, card_id) for card_id, due in rows if due)
+            heapq.heapify(self._heap)
+            self._loaded = True
+        self._last_id = rows[-1][0]
+
+    def _pop(self, now):
+        """
+        Pop the next (due, card id) to ask, skipping stale entries: reviews due by now
+        soonest first, then new cards, then reviews not due yet. None if there are no cards.
+        """
+        while self._heap and self._heap[0][0] <= now:
+            due, card_id = heapq.heappop(self._heap)
+            if self._due.get(card_id) == due:
+                return due, card_id
+        while self._new:
+            card_id = self._new.popleft()
+            if self._due.get(card_id) == 0:
+                return 0, card_id
+        while self._heap:
+            due, card_id = heapq.heappop(self._heap)
+            if self._due.get(card_id) == due:
+                return due, card_id
+        return None
+
+    def _push(self, entries):
+        """Put back entries taken by _pop, new cards keep their place at the front"""
+        for due, card_id in reversed(entries):
+            if due:
+                heapq.heappush(self._heap, (due, card_id))
+            else:
+                self._new.appendleft(card_id)
+
+    def next_card(self, recent=None):
+        """
+        Get the next card to ask as a dictionary (see FlashcardStore.get_card), or None with no cards.
+        Reviews that are due come first, then new cards, then the review due soonest:
+        cards aren't held back until due, an alarm always needs a question.
+        recent: optional recent_filter.RecentFilter, up to MAX_RETRIES recently asked cards are passed over
+        """
+        with self.lock:
+            self._sync()
+            now = self.clock()
+            collisions = 0 # Recent cards passed over, for recent_filter.report()
+            while True:
+                popped = []
+                chosen = None
+                repeated = False
+                while len(popped) <= recent_filter.MAX_RETRIES:
+                    entry = self._pop(now)
+                    if entry is None:
+                        break
+                    popped.append(entry)
+                    if recent is None or entry[1] not in recent:
+                        chosen = entry
+                        break
+                    collisions += 1
+                if chosen is None and popped:
+                    chosen = popped[0] # Every candidate was recent, ask the first anyway
+                    repeated = True
+                self._push(popped)
+                if chosen is None:
+                    return None
+
+                card = self.store.get_card(chosen[1])
+                if card is None:
+                    del self._due[chosen[1]] # Removed from the store
+                    continue
+                if recent is not None:
+                    recent.add(card['id'])
+                    recent.record(collisions, repeated)
+                return card
+
+    def record_answer(self, card_id, correct, grade=True):
+        """
+        Save an answer to a card.
+        grade: whether the answer reschedules the card, False for retries after a
+        wrong answer, which are saved but already counted as forgotten
+        Returns the card's new schedule, or None if it wasn't regraded.
+        """
+        quality = CORRECT_QUALITY if correct else WRONG_QUALITY
+        with self.lock:
+            card = self.store.get_card(card_id) if grade else None
+            if card is None:
+                self.store.record_review(card_id, correct)
+                return None
+            schedule = next_schedule(card['repetitions'], card['interval_days'], card['ease'], quality, self.clock())
+            self.store.record_review(card_id, correct, quality, schedule)
+            if card_id in self._due:
+                self._due[card_id] = schedule['due']
+                heapq.heappush(self._heap, (schedule['due'], card_id))
+            return schedule